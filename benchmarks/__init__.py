@@ -0,0 +1,10 @@
+"""read_mhtml 변환 성능 벤치마크
+
+generate: 모양(파트 수, 크기, 인코딩, 참조 방식 등)을 조절할 수 있는 합성 MHTML 생성기
+run: 시나리오별 처리량(files/sec, MB/sec)과 최대 RSS 측정 및 기준값(baseline) 비교
+
+사용 예시:
+    python -m benchmarks.run --save-baseline main
+    python -m benchmarks.run --compare main
+    python -m benchmarks.run --scenarios huge-parts  # 128 MB 파트 두 개 (최대 RSS 확인용)
+"""
@@ -0,0 +1,131 @@
+"""합성 MHTML 아카이브 생성기
+
+Chrome의 "웹페이지, 단일 파일" 저장 형식을 흉내 내어 multipart/related 메시지를 만든다.
+같은 seed로 생성하면 항상 같은 바이트가 나온다.
+"""
+import argparse
+import base64
+import quopri
+import random
+from pathlib import Path
+
+BOUNDARY = "----MultipartBoundary--benchmark"
+BASE_URL = "https://bench.example.com/"
+
+# 비 UTF-8 메인 문서에 넣을 텍스트 (해당 인코딩으로 표현 가능한 문자열)
+SAMPLE_TEXT = {
+    "utf-8": "벤치마크 문서 – benchmark document ✓",
+    "euc-kr": "벤치마크 문서입니다",
+    "cp949": "벤치마크 문서입니다",
+    "shift_jis": "ベンチマーク文書です",
+    "iso-8859-1": "Document de référence",
+}
+
+def _encode_body(body, encoding):
+    """Content-Transfer-Encoding에 맞게 본문을 인코딩 (CRLF 줄바꿈)"""
+    if encoding == "base64":
+        encoded = base64.encodebytes(body)
+    else:
+        encoded = quopri.encodestring(body)
+    return encoded.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+
+def _part(content_type, body, encoding, location=None, content_id=None):
+    headers = [f"Content-Type: {content_type}", f"Content-Transfer-Encoding: {encoding}"]
+    if location:
+        headers.append(f"Content-Location: {location}")
+    if content_id:
+        headers.append(f"Content-ID: <{content_id}>")
+    return (f"--{BOUNDARY}\r\n" + "\r\n".join(headers) + "\r\n\r\n").encode("ascii") \
+        + _encode_body(body, encoding) + b"\r\n"
+
+def generate_mhtml(path, parts=20, payload_size=16 * 1024, encoding="base64", references="location",
+                   frames=0, css_urls=0, charset="utf-8", seed=0):
+    """합성 MHTML 파일을 path에 쓰고 파일 크기를 반환
+
+    parts: 이미지 리소스 파트 수
+    payload_size: 이미지 파트 하나의 디코딩된 크기 (바이트)
+    encoding: 이미지 파트의 전송 인코딩 ("base64", "quoted-printable", "mixed")
+    references: 메인 문서가 리소스를 가리키는 방식 ("location", "cid", "mixed")
+    frames: 추가 text/html 파트(iframe) 수
+    css_urls: 스타일시트 안의 url() 개수
+    charset: 메인 HTML 문서의 문자 인코딩
+    """
+    rng = random.Random(seed)
+    resources = []  # [(참조 URL, Content-Location, Content-ID), ...]
+    for i in range(parts):
+        location = f"{BASE_URL}img/{i}.png"
+        use_cid = references == "cid" or (references == "mixed" and i % 2)
+        content_id = f"img{i}@benchmark" if use_cid else None
+        resources.append((f"cid:{content_id}" if use_cid else location,
+                          None if use_cid else location, content_id))
+
+    def resource_ref(i):
+        return resources[i % len(resources)][0] if resources else f"{BASE_URL}missing.png"
+
+    css = "".join(f".c{i}{{background:url('{resource_ref(i)}')}}\n" for i in range(css_urls))
+    css += "@font-face{font-family:b;src:url(fonts/bench.woff2)}\n"
+
+    body = [f"<p>{SAMPLE_TEXT.get(charset, SAMPLE_TEXT['iso-8859-1'])}</p>"]
+    body += [f'<img src="{ref}" alt="{i}">' for i, (ref, _, _) in enumerate(resources)]
+    body += [f'<iframe src="{BASE_URL}frame/{i}.html"></iframe>' for i in range(frames)]
+    html = (f'<!DOCTYPE html><html><head><meta charset="{charset}">'
+            f'<link rel="stylesheet" href="{BASE_URL}style.css">'
+            f'<script src="{BASE_URL}app.js"></script></head>'
+            f'<body style="background:url(\'{resource_ref(0)}\')">' + "\n".join(body) + "</body></html>")
+
+    out = [(f'From: <Saved by Blink>\r\nSubject: benchmark\r\nMIME-Version: 1.0\r\n'
+            f'Content-Type: multipart/related;\r\n\ttype="text/html";\r\n\tboundary="{BOUNDARY}"\r\n\r\n\r\n')
+           .encode("ascii")]
+    out.append(_part(f"text/html; charset={charset}", html.encode(charset, errors="replace"),
+                     "quoted-printable", location=f"{BASE_URL}index.html"))
+    out.append(_part("text/css", css.encode("utf-8"), "quoted-printable", location=f"{BASE_URL}style.css"))
+    out.append(_part("application/javascript", b"console.log('benchmark');\n" * 50, "quoted-printable",
+                     location=f"{BASE_URL}app.js"))
+    for i, (_, location, content_id) in enumerate(resources):
+        part_encoding = encoding if encoding != "mixed" else ("base64", "quoted-printable")[i % 2]
+        out.append(_part("image/png", rng.randbytes(payload_size), part_encoding,
+                         location=location, content_id=content_id))
+    for i in range(frames):
+        frame = (f'<html><body><img src="{resource_ref(i)}">'
+                 f'<div style="background:url({resource_ref(i + 1)})">frame {i}</div></body></html>')
+        out.append(_part("text/html", frame.encode("utf-8"), "quoted-printable",
+                         location=f"{BASE_URL}frame/{i}.html", content_id=f"frame{i}@benchmark"))
+    out.append(f"--{BOUNDARY}--\r\n".encode("ascii"))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = b"".join(out)
+    path.write_bytes(data)
+    return len(data)
+
+def generate_corpus(out_dir, count, file_name="original.mhtml", seed=0, **shape):
+    """out_dir/<번호>/file_name 형태로 count개의 아카이브를 만들고 경로 목록을 반환"""
+    paths = []
+    for i in range(count):
+        path = Path(out_dir) / f"{i:05d}" / file_name
+        generate_mhtml(path, seed=seed + i, **shape)
+        paths.append(path)
+    return paths
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="합성 MHTML 코퍼스 생성")
+    arg_parser.add_argument("out_dir")
+    arg_parser.add_argument("--count", type=int, default=10)
+    arg_parser.add_argument("--parts", type=int, default=20)
+    arg_parser.add_argument("--payload-size", type=int, default=16 * 1024)
+    arg_parser.add_argument("--encoding", choices=["base64", "quoted-printable", "mixed"], default="base64")
+    arg_parser.add_argument("--references", choices=["location", "cid", "mixed"], default="location")
+    arg_parser.add_argument("--frames", type=int, default=0)
+    arg_parser.add_argument("--css-urls", type=int, default=0)
+    arg_parser.add_argument("--charset", default="utf-8")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    paths = generate_corpus(args.out_dir, args.count, seed=args.seed, parts=args.parts,
+                            payload_size=args.payload_size, encoding=args.encoding,
+                            references=args.references, frames=args.frames,
+                            css_urls=args.css_urls, charset=args.charset)
+    print(f"Generated {len(paths)} archives in {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
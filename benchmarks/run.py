@@ -0,0 +1,147 @@
+"""시나리오별 변환 처리량 / 최대 메모리 측정과 기준값 비교
+
+각 시나리오는 새 프로세스(spawn)에서 실행하므로 최대 RSS가 시나리오끼리 섞이지 않는다.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generate import generate_corpus
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# 시나리오 이름 -> generate_mhtml 인자
+SCENARIOS = {
+    "small-pages": dict(parts=10, payload_size=4 * 1024),
+    "many-parts": dict(parts=300, payload_size=2 * 1024),
+    "large-images": dict(parts=4, payload_size=8 * 1024 * 1024),
+    "quoted-printable": dict(parts=20, payload_size=64 * 1024, encoding="quoted-printable"),
+    "cid-references": dict(parts=50, payload_size=8 * 1024, references="cid"),
+    "frames": dict(parts=20, payload_size=8 * 1024, frames=30, references="mixed"),
+    "css-urls": dict(parts=50, payload_size=4 * 1024, css_urls=2000),
+    "euc-kr": dict(parts=10, payload_size=8 * 1024, charset="euc-kr"),
+    "huge-parts": dict(parts=2, payload_size=128 * 1024 * 1024),
+}
+# 아카이브 하나가 수백 MB인 시나리오: 파일 수를 고정하고 이름을 지정했을 때만 실행
+LARGE_SCENARIO_FILES = {"huge-parts": 1}
+
+def _max_rss():
+    """현재 프로세스의 최대 RSS (바이트)
+    
+    Linux의 ru_maxrss는 fork 전 부모의 사용량까지 이어받으므로 가능하면 /proc의 VmHWM을 사용한다.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+def _run_in_child(paths, repeat, options):
+    """자식 프로세스에서 변환을 반복하고 (경과 시간 목록, 최대 RSS)를 반환"""
+    import read_mhtml
+    logging.getLogger("read_mhtml").setLevel(logging.WARNING)
+
+    elapsed = []
+    for _ in range(repeat):
+        # 매 반복마다 이전 변환 결과를 지운 깨끗한 복사본에서 실행
+        work_paths = []
+        for path in paths:
+            work_dir = Path(path).parent / "work"
+            shutil.rmtree(work_dir, ignore_errors=True)
+            work_dir.mkdir()
+            work_paths.append(shutil.copy(path, work_dir))
+        start = time.perf_counter()
+        for path in work_paths:
+            read_mhtml.parse_mhtml_file(path, **options)
+        elapsed.append(time.perf_counter() - start)
+    return elapsed, _max_rss()
+
+def run_scenario(name, files=5, repeat=3, options=None, shape=None):
+    """시나리오 하나를 측정하여 결과 dict를 반환 (반복 중 가장 빠른 값 기준)"""
+    shape = shape or SCENARIOS[name]
+    options = dict({"download_fonts": False}, **(options or {}))
+    with tempfile.TemporaryDirectory(prefix=f"mhtml-bench-{name}-") as tmp:
+        paths = generate_corpus(tmp, files, **shape)
+        input_bytes = sum(path.stat().st_size for path in paths)
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            elapsed, max_rss = pool.apply(_run_in_child, ([str(path) for path in paths], repeat, options))
+    best = min(elapsed)
+    return {
+        "files": files,
+        "input_mb": round(input_bytes / 1e6, 3),
+        "seconds": round(best, 4),
+        "files_per_sec": round(files / best, 2),
+        "mb_per_sec": round(input_bytes / 1e6 / best, 2),
+        "peak_rss_mb": round(max_rss / 1e6, 1) if max_rss else None,
+    }
+
+def compare(results, baseline, threshold):
+    """기준값 대비 변화를 출력하고 회귀가 있으면 True 반환"""
+    regressed = False
+    print(f"\n{'scenario':<18}{'MB/s':>10}{'base':>10}{'change':>9}{'RSS MB':>10}{'base':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<18}{result['mb_per_sec']:>10}{'-':>10}")
+            continue
+        speed = result["mb_per_sec"] / base["mb_per_sec"] - 1
+        flag = ""
+        if speed < -threshold:
+            flag = "  <- slower"
+            regressed = True
+        if result["peak_rss_mb"] and base.get("peak_rss_mb") and \
+                result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            flag += "  <- more memory"
+            regressed = True
+        print(f"{name:<18}{result['mb_per_sec']:>10}{base['mb_per_sec']:>10}{speed:>+9.1%}"
+              f"{result['peak_rss_mb'] or '-':>10}{base.get('peak_rss_mb') or '-':>10}{flag}")
+    return regressed
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="read_mhtml 변환 벤치마크")
+    arg_parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS),
+                            default=sorted(set(SCENARIOS) - set(LARGE_SCENARIO_FILES)))
+    arg_parser.add_argument("--files", type=int, default=5, help="시나리오당 아카이브 수")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    arg_parser.add_argument("--rewrite-engine", default="stream")
+    arg_parser.add_argument("--save-baseline", metavar="NAME", help="결과를 baselines/NAME.json으로 저장")
+    arg_parser.add_argument("--compare", metavar="NAME", help="baselines/NAME.json과 비교")
+    arg_parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 판단할 변화율")
+    args = arg_parser.parse_args(argv)
+
+    results = {}
+    for name in args.scenarios:
+        results[name] = run_scenario(name, files=LARGE_SCENARIO_FILES.get(name, args.files), repeat=args.repeat,
+                                     options={"rewrite_engine": args.rewrite_engine})
+        result = results[name]
+        print(f"{name:<18}{result['files_per_sec']:>10} files/s{result['mb_per_sec']:>10} MB/s"
+              f"{result['peak_rss_mb'] or '-':>10} MB peak RSS")
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved baseline: {path}")
+
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f"{args.compare}.json").read_text(encoding="utf-8"))
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,133 +1,1778 @@
 from email import parser
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 import email
 import chardet  # 인코딩 감지를 위한 라이브러리 추가
+import codecs
 from bs4 import BeautifulSoup  # HTML 파싱을 위한 라이브러리 추가
+from html.parser import HTMLParser  # 스트리밍 재작성용 토크나이저
 import re
 import string
 import uuid
 import os
+import stat
+import posixpath
 import requests  # 웹 폰트 다운로드를 위해 추가
-from urllib.parse import urljoin, urlparse  # URL 처리를 위해 추가
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, quote, unquote, unquote_to_bytes, parse_qs  # URL 처리를 위해 추가
+import fnmatch
+import functools
+import itertools
+import time
+import argparse
+import mmap
+import base64
+import binascii
+import hashlib
+import shutil
+import json
+import threading
+import logging
+import contextlib
+import io
+import tarfile
+import gzip
+import tempfile
+import zipfile
+import tracemalloc
+import sys
+import signal
+import heapq
+from collections import OrderedDict
+try:
+    import resource  # 최대 RSS 측정 (Windows에는 없음)
+except ImportError:
+    resource = None
+try:
+    import cchardet as fast_chardet  # 설치되어 있으면 chardet 대신 사용하는 C 구현 인코딩 감지
+except ImportError:
+    fast_chardet = None
+try:
+    import brotli  # 설치되어 있으면 미리 압축한 .br 사본도 만듦
+except ImportError:
+    brotli = None
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED  # 배치 변환용 프로세스 풀
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler  # 서버 모드
+
+logger = logging.getLogger("read_mhtml")
+# 파일별 변환 요약 이벤트 (JSON 한 줄) 전용 로거. 기본적으로 다른 로그와 섞이지 않도록 전파하지 않는다.
+summary_logger = logging.getLogger("read_mhtml.summary")
+summary_logger.propagate = False
 
 # 전역 설정 변수 추가
 DOWNLOAD_FONTS = False  # 폰트 다운로드 활성화 여부
+CHUNK_SIZE = 1024 * 1024  # 페이로드 스트리밍 디코딩 단위 (바이트)
+SCAN_WINDOW = 16 * 1024 * 1024  # 파트 경계를 찾을 때 한 번에 검색하는 범위 (바이트)
+HEADER_SCAN_SIZE = 64 * 1024  # 헤더 끝(빈 줄)을 먼저 찾아볼 범위 (바이트)
+CONVERTER_VERSION = "4"  # 출력 형식이 바뀌면 올려서 증분 변환 매니페스트를 무효화
 
-def parse_mhtml_file(file_path, download_fonts=True):
-    global DOWNLOAD_FONTS
-    DOWNLOAD_FONTS = download_fonts
+_BASE64_WHITESPACE = b" \t\r\n"
+
+def _release_pages(buffer, start, end):
+    """mmap의 [start, end) 범위를 이 프로세스에서 내려놓음 (RSS 감소)
     
-    # MHTML 파일 경로 처리
-    mhtml_path = Path(file_path)
-    output_html_name = f"{mhtml_path.stem}.html"  # .mhtml을 .html로 변경
-    output_dir = mhtml_path.parent  # MHTML 파일이 있는 디렉토리
+    읽기 전용 파일 매핑이라 다시 읽으면 페이지 캐시에서 그대로 복구되므로 내용에는 영향이 없다.
+    bytes 버퍼이거나 madvise를 지원하지 않는 플랫폼에서는 아무것도 하지 않는다.
+    """
+    if end - start < CHUNK_SIZE or not isinstance(buffer, mmap.mmap) or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    start -= start % mmap.PAGESIZE
+    buffer.madvise(mmap.MADV_DONTNEED, start, min(end, len(buffer)) - start)
+
+def _find_boundary(buffer, needle, start, end):
+    """buffer.find와 같지만 SCAN_WINDOW 단위로 검색하며 지나간 범위의 페이지를 내려놓음
+    
+    수백 MB짜리 파트의 경계를 찾는 동안 파트 전체가 RSS에 올라가지 않게 한다.
+    """
+    while end - start > SCAN_WINDOW:
+        window_end = start + SCAN_WINDOW
+        # 경계가 창 끝에 걸칠 수 있으므로 needle 길이만큼 겹쳐서 검색
+        pos = buffer.find(needle, start, window_end + len(needle) - 1)
+        if pos >= 0:
+            return pos
+        _release_pages(buffer, start, window_end)
+        start = window_end
+    return buffer.find(needle, start, end)
+
+def _split_headers(buffer, start, end):
+    """[start, end) 범위에서 헤더 블록의 끝과 본문 시작 위치를 반환"""
+    if buffer[start:start + 2] == b"\r\n":
+        return start, start + 2
+    if buffer[start:start + 1] == b"\n":
+        return start, start + 1
+    # 헤더는 짧으므로 앞부분에서 먼저 찾고, 없을 때만 범위 끝까지 찾음 (본문 전체를 훑지 않도록)
+    for limit in (min(end, start + HEADER_SCAN_SIZE), end):
+        crlf = buffer.find(b"\n\r\n", start, limit)
+        lf = buffer.find(b"\n\n", start, crlf + 2 if crlf >= 0 else limit)
+        if crlf >= 0 or lf >= 0:
+            break
+    else:
+        # 빈 줄이 없으면 전체를 헤더로 취급
+        return end, end
+    if lf < 0 or (0 <= crlf < lf):
+        return crlf + 1, crlf + 3
+    return lf + 1, lf + 2
+
+class MHTMLPart:
+    """바이트 버퍼(mmap 또는 bytes) 위의 MIME 파트 하나
+    
+    헤더만 파싱해두고 본문은 [body_start, body_end) 범위로만 기억한다.
+    email.message.Message와 같은 이름의 get / get_content_type / get_payload를 제공한다.
+    """
+    
+    def __init__(self, buffer, headers, body_start, body_end):
+        self.buffer = buffer
+        self.headers = headers
+        self.body_start = body_start
+        self.body_end = body_end
+    
+    def get(self, name, default=None):
+        return self.headers.get(name, default)
+    
+    def get_content_type(self):
+        return self.headers.get_content_type()
+    
+    def get_content_charset(self, default=None):
+        return self.headers.get_content_charset(default)
+    
+    def is_multipart(self):
+        return self.headers.get_content_maintype() == 'multipart'
+    
+    def is_empty(self):
+        return self.body_end <= self.body_start
+    
+    def iter_payload(self, chunk_size=None):
+        """Content-Transfer-Encoding에 따라 본문을 청크 단위로 디코딩하여 yield"""
+        chunk_size = chunk_size or CHUNK_SIZE
+        encoding = str(self.headers.get("Content-Transfer-Encoding", "")).strip().lower()
+        pending = b""
+        for pos in range(self.body_start, self.body_end, chunk_size):
+            raw = self.buffer[pos:min(pos + chunk_size, self.body_end)]
+            # 큰 파트는 읽은 청크의 mmap 페이지를 바로 내려놓아 RSS를 청크 크기로 제한
+            _release_pages(self.buffer, pos, pos + len(raw))
+            if encoding == "base64":
+                data = pending + raw.translate(None, _BASE64_WHITESPACE)
+                cut = len(data) - len(data) % 4
+                pending = data[cut:]
+                if cut:
+                    yield binascii.a2b_base64(data[:cut])
+            elif encoding == "quoted-printable":
+                # soft line break(=\r\n)나 =XX가 청크 경계에서 잘리지 않도록 줄 단위로 자름
+                data = pending + raw
+                cut = data.rfind(b"\n") + 1
+                pending = data[cut:]
+                if cut:
+                    yield binascii.a2b_qp(data[:cut])
+            else:
+                yield bytes(raw)
+        if pending:
+            if encoding == "base64":
+                # 패딩이 누락된 경우 보정
+                pending += b"=" * (-len(pending) % 4)
+                try:
+                    yield binascii.a2b_base64(pending)
+                except binascii.Error:
+                    pass
+            else:
+                yield binascii.a2b_qp(pending)
+    
+    def get_payload(self, decode=True, chunk_size=None):
+        """디코딩된 본문 전체를 bytes로 반환 (HTML/CSS처럼 재작성이 필요한 파트용)"""
+        if self.is_multipart():
+            return None
+        return b"".join(self.iter_payload(chunk_size))
+    
+    def write_payload(self, f, chunk_size=None):
+        """디코딩된 본문을 청크 단위로 파일 객체에 기록하고 기록한 바이트 수를 반환"""
+        written = 0
+        for chunk in self.iter_payload(chunk_size):
+            f.write(chunk)
+            written += len(chunk)
+        return written
+
+def store_payload(chunks, store_dir, suffix="", reread=None):
+    """디코딩된 청크를 내용 해시(sha256) 이름으로 공유 저장소에 기록하고 저장 경로를 반환
+    
+    같은 내용이 이미 저장되어 있으면 다시 쓰지 않는다. 임시 파일에 쓰면서 해시를 계산한 뒤
+    os.replace로 옮기므로 여러 프로세스가 같은 저장소를 동시에 사용해도 안전하다.
+    reread(청크를 처음부터 다시 만드는 함수)를 주면 먼저 해시만 계산하고, 저장소에 없는 내용일 때만
+    reread()의 청크를 기록한다. 중복된 내용은 임시 파일에도 쓰지 않으므로 디스크 쓰기가 없다.
+    """
+    store_dir = Path(store_dir)
+    if reread is not None:
+        digest = hashlib.sha256()
+        for chunk in chunks:
+            digest.update(chunk)
+        hex_digest = digest.hexdigest()
+        store_path = store_dir / hex_digest[:2] / f"{hex_digest}{suffix}"
+        if store_path.exists():
+            return store_path
+        chunks = reread()
+    tmp_dir = store_dir / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"{uuid.uuid4().hex}{suffix}"
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+        hex_digest = digest.hexdigest()
+        store_path = store_dir / hex_digest[:2] / f"{hex_digest}{suffix}"
+        if store_path.exists():
+            tmp_path.unlink()
+        else:
+            store_path.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, store_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return store_path
+
+def link_stored_payload(store_path, target_dir):
+    """저장소 파일을 target_dir에 하드링크 (실패 시 복사)하고 링크 경로를 반환"""
+    # 해시 기반 이름이라 재실행해도 같은 경로가 나온다
+    link_path = Path(target_dir) / f"{store_path.stem[:16]}{store_path.suffix}"
+    if link_path.exists():
+        if os.path.samefile(link_path, store_path):
+            return link_path
+        link_path.unlink()
+    try:
+        os.link(store_path, link_path)
+    except OSError:
+        # 다른 파일시스템이거나 하드링크를 지원하지 않는 경우
+        shutil.copyfile(store_path, link_path)
+    return link_path
+
+def iter_mhtml_parts(buffer, start=0, end=None):
+    """버퍼에서 MIME 파트를 순서대로 yield (multipart 컨테이너는 재귀적으로 펼침)
+    
+    경계(boundary)는 버퍼에서 증분적으로 검색하므로 메시지 트리 전체를 메모리에 만들지 않는다.
+    """
+    end = len(buffer) if end is None else end
+    header_end, body_start = _split_headers(buffer, start, end)
+    headers = parser.BytesHeaderParser().parsebytes(bytes(buffer[start:header_end]))
+    part = MHTMLPart(buffer, headers, body_start, end)
+    
+    boundary = headers.get_boundary() if part.is_multipart() else None
+    if not boundary:
+        yield part
+        return
+    
+    delimiter = b"--" + boundary.encode("ascii", errors="ignore")
+    # 첫 번째 경계 찾기 (preamble 건너뛰기)
+    pos = body_start if buffer[body_start:body_start + len(delimiter)] == delimiter else -1
+    if pos < 0:
+        pos = buffer.find(b"\n" + delimiter, body_start, end)
+        if pos < 0:
+            return
+        pos += 1
+    while True:
+        after = pos + len(delimiter)
+        if buffer[after:after + 2] == b"--":
+            # 닫는 경계
+            return
+        line_end = buffer.find(b"\n", after, end)
+        if line_end < 0:
+            return
+        part_start = line_end + 1
+        next_pos = _find_boundary(buffer, b"\n" + delimiter, part_start, end)
+        if next_pos < 0:
+            # 닫는 경계가 없는 잘린 파일: 끝까지를 마지막 파트로 처리
+            part_end = next_pos = end
+        else:
+            # 경계 앞의 줄바꿈은 본문에 포함되지 않음
+            part_end = next_pos - 1 if buffer[next_pos - 1:next_pos] == b"\r" else next_pos
+            next_pos += 1
+        if part_end > part_start:
+            yield from iter_mhtml_parts(buffer, part_start, part_end)
+        if next_pos >= end:
+            return
+        pos = next_pos
+
+# 리소스 경로를 가진 태그 -> {속성: 값 형식} ("url": URL 하나, "srcset": 쉼표로 구분한 이미지 후보 목록)
+# 두 재작성 엔진 모두 이 표만 보고 한 번의 순회에서 모든 속성을 처리한다
+RESOURCE_TAG_ATTRS = {
+    'img': {'src': 'url', 'srcset': 'srcset'},
+    'source': {'src': 'url', 'srcset': 'srcset'},  # <picture>, <video>, <audio> 안의 후보
+    'script': {'src': 'url'},
+    'link': {'href': 'url', 'imagesrcset': 'srcset'},
+    'iframe': {'src': 'url'},
+    'frame': {'src': 'url'},
+    'video': {'src': 'url', 'poster': 'url'},
+    'audio': {'src': 'url'},
+    'track': {'src': 'url'},
+    'object': {'data': 'url'},
+    'embed': {'src': 'url'},
+    'input': {'src': 'url'},  # type=image
+}
+# srcset 후보의 URL (앞의 공백/쉼표 다음부터 공백 전까지, HTML 표준의 srcset 파싱 규칙)
+_SRCSET_URL_PATTERN = re.compile(r'[\s,]*([^\s,]\S*)')
+
+def rewrite_srcset(srcset, rewrite):
+    """srcset 값의 후보 URL마다 rewrite(url)을 적용한 문자열을 반환
+    
+    rewrite가 None을 반환한 URL과 서술자(1x, 480w 등), 공백은 그대로 둔다.
+    공백이 나올 때까지를 URL로 보므로 data: URI 안의 쉼표는 후보 구분자로 취급하지 않는다.
+    """
+    out = []
+    pos = 0
+    while True:
+        match = _SRCSET_URL_PATTERN.match(srcset, pos)
+        if not match:
+            break
+        # URL 끝의 쉼표는 서술자 없이 후보가 끝났다는 뜻
+        url = match.group(1).rstrip(',')
+        url_end = match.start(1) + len(url)
+        new_url = rewrite(url)
+        out.append(srcset[pos:match.start(1)])
+        out.append(url if new_url is None else new_url)
+        pos = url_end
+        if url_end == match.end(1):
+            # 서술자는 다음 쉼표까지
+            comma = srcset.find(',', url_end)
+            pos = len(srcset) if comma < 0 else comma
+            out.append(srcset[url_end:pos])
+    out.append(srcset[pos:])
+    return ''.join(out)
+
+# CSS 참조 스캐너: 주석은 건너뛰고 url(...)과 @import "..." 를 한 번의 패스로 찾는다
+CSS_REFERENCE_PATTERN = re.compile(r'''
+    /\*.*?\*/
+  | url\(\s*(?:"(?P<url_dq>[^"]*)"|'(?P<url_sq>[^']*)'|(?P<url_bare>[^'"()\s]*))\s*\)
+  | @import\s+(?:"(?P<import_dq>[^"]*)"|'(?P<import_sq>[^']*)')
+''', re.VERBOSE | re.DOTALL | re.IGNORECASE)
+# (그룹 이름, 참조 종류, 따옴표로 감싸져 있는지)
+_CSS_REFERENCE_GROUPS = (
+    ('url_dq', 'url()', True),
+    ('url_sq', 'url()', True),
+    ('url_bare', 'url()', False),
+    ('import_dq', '@import', True),
+    ('import_sq', '@import', True),
+)
+# 따옴표 없는 url() 안에 그대로 넣을 수 없는 문자
+_CSS_BARE_URL_UNSAFE = re.compile(r'[\s\'"()\\]')
+# 매핑되지 않아도 보고하지 않는 URL (외부 URL, data URI, 절대 경로)
+UNTRACKED_URL_PREFIXES = ('http://', 'https://', 'data:', '/')
+
+# 정규화 후 다시 인코딩할 때 그대로 둘 문자
+_URL_PATH_SAFE = "/:@!$&'()*+,;=-._~"
+_URL_QUERY_SAFE = "/:@!$&'()*+,;=-._~?"
+_DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+def normalize_url(url, base_url=None):
+    """리소스 조회용 URL 키를 정규화
+    
+    문서 기준 URL로 상대/프로토콜 상대(//) URL을 해석하고, 스킴과 호스트를 소문자로,
+    퍼센트 인코딩을 일관된 형태로 바꾸고, 프래그먼트(#...)를 제거한다.
+    퍼센트 인코딩은 바이트 단위로 풀고 다시 인코딩하므로 UTF-8이 아닌 이스케이프(예: EUC-KR)도 보존된다.
+    잘못된 URL(예: 닫히지 않은 IPv6 호스트)이면 ValueError를 던진다.
+    """
+    url = url.strip()
+    if url[:4].lower() == 'cid:':
+        return 'cid:' + url[4:].strip('<>')
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if netloc.endswith(_DEFAULT_PORTS.get(scheme, '\0')):
+        netloc = netloc[:-len(_DEFAULT_PORTS[scheme])]
+    path = quote(unquote_to_bytes(parts.path), safe=_URL_PATH_SAFE)
+    if netloc and not path:
+        path = '/'
+    query = quote(unquote_to_bytes(parts.query), safe=_URL_QUERY_SAFE)
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def _css_reference(match):
+    """CSS_REFERENCE_PATTERN 매치에서 (그룹 이름, 참조 종류, 따옴표 여부)를 반환 (주석이면 None)"""
+    for group, kind, quoted in _CSS_REFERENCE_GROUPS:
+        if match.group(group) is not None:
+            return group, kind, quoted
+    return None
+
+def iter_css_urls(css):
+    """CSS 텍스트의 url()과 @import 대상 URL을 (URL, 참조 종류) 순서대로 yield"""
+    for match in CSS_REFERENCE_PATTERN.finditer(css):
+        reference = _css_reference(match)
+        if reference and match.group(reference[0]).strip():
+            yield match.group(reference[0]).strip(), reference[1]
+
+def rewrite_css(css, rewrite):
+    """CSS 텍스트의 url()과 @import를 한 번의 스캔으로 재작성
+    
+    rewrite(URL, 참조 종류)는 새 URL을 반환하거나, 바꾸지 않으면 None을 반환한다.
+    바뀌지 않은 부분(주석, 공백, 따옴표 모양)은 원문 그대로 유지한다.
+    """
+    def replace(match):
+        reference = _css_reference(match)
+        if reference is None:
+            return match.group(0)
+        group, kind, quoted = reference
+        url = match.group(group).strip()
+        new_url = rewrite(url, kind) if url else None
+        if new_url is None:
+            return match.group(0)
+        if not quoted and _CSS_BARE_URL_UNSAFE.search(new_url):
+            new_url = '"' + new_url.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        start, end = match.start(group) - match.start(), match.end(group) - match.start()
+        return match.group(0)[:start] + new_url + match.group(0)[end:]
+    return CSS_REFERENCE_PATTERN.sub(replace, css)
+
+class ResourceIndex:
+    """아카이브 하나의 resource_mapping / cid_mapping을 합친 URL 조회 인덱스
+    
+    모든 키를 normalize_url로 정규화해 하나의 딕셔너리에 넣고,
+    (url, 기준 URL) 조회 결과는 LRU 캐시에 보관한다.
+    피클할 때는 조회 테이블만 넘기고 받는 쪽에서 캐시를 새로 만든다 (프로세스 풀에 넘기는 스냅샷).
+    """
+    
+    def __init__(self, resource_mapping=None, cid_mapping=None, cache_size=4096):
+        self.cache_size = cache_size
+        self._exact = {}
+        self._without_query = {}  # 쿼리 문자열만 다른 URL을 위한 보조 인덱스
+        for url, path in (resource_mapping or {}).items():
+            self.add(url, path)
+        for content_id, path in (cid_mapping or {}).items():
+            self.add(f"cid:{content_id}", path)
+        self.resolve = functools.lru_cache(maxsize=cache_size)(self._resolve)
+    
+    def add(self, url, path):
+        if not url:
+            return
+        try:
+            key = normalize_url(url)
+        except ValueError:
+            logger.debug("Skipped malformed resource URL: %s", url)
+            return
+        self._exact[key] = path
+        self._without_query.setdefault(key.split('?', 1)[0], path)
+    
+    def __len__(self):
+        return len(self._exact)
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["resolve"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.resolve = functools.lru_cache(maxsize=self.cache_size)(self._resolve)
+    
+    def _resolve(self, url, base_url=None):
+        """URL에 해당하는 로컬 경로를 반환 (없으면 None)"""
+        if not url or url.startswith(('data:', 'javascript:', '#')):
+            return None
+        try:
+            key = normalize_url(url, base_url)
+            path = self._exact.get(key)
+            if path is None and base_url:
+                # 기준 URL 없이 저장된 키 (예: < > 없는 Content-ID)
+                path = self._exact.get(normalize_url(url))
+        except ValueError:
+            # 잘못된 URL은 해석할 수 없는 참조로 취급
+            return None
+        if path is None and '?' in key:
+            path = self._without_query.get(key.split('?', 1)[0])
+        return path
+
+class ResourceRewriter:
+    """HTML 문서(또는 스타일시트) 하나의 리소스 URL을 로컬 경로로 바꾸고 교체/미매핑 현황을 기록
+    
+    document_dir는 재작성한 문서가 기록될 디렉토리 (출력 루트 기준, 예: "resource/css")로,
+    출력 루트 기준인 로컬 경로를 이 디렉토리에서의 상대 경로로 바꿔 넣는다.
+    embed(로컬 경로)가 문자열을 반환하면 파일 대신 그 값(data: URI)을 참조한다 (단일 파일 모드).
+    """
+    
+    def __init__(self, resource_index, base_url=None, stats=None, document_dir="", embed=None):
+        self.resource_index = resource_index
+        self.base_url = base_url or None
+        self.document_dir = document_dir
+        self.embed = embed
+        # 재작성 엔진이 파싱/재작성/직렬화 시간을 기록할 ConversionStats
+        self.stats = stats if stats is not None else ConversionStats()
+        self.reset()
+    
+    def reset(self):
+        self.replacement_count = 0
+        self.unmapped = set()  # 매핑되지 않은 리소스 추적
+        self.preview = []  # [(태그 이름, 최종 경로), ...] 디버깅 출력용
+    
+    def lookup(self, url):
+        """URL에 해당하는 로컬 경로를 반환 (없으면 None)"""
+        path = self.resource_index.resolve(url, self.base_url)
+        if path is not None and self.embed is not None:
+            path = self.embed(path) or path
+        if path is None or not self.document_dir or path.startswith(('data:', '/')):
+            return path
+        return posixpath.relpath(path, self.document_dir)
+    
+    def rewrite_url(self, url, label):
+        """매핑된 로컬 경로를 반환하고, 없으면 미매핑으로 기록한 뒤 None 반환"""
+        new_url = self.lookup(url)
+        if new_url is not None:
+            self.replacement_count += 1
+            logger.debug("Replaced (%d) %s -> %s", self.replacement_count, url, new_url)
+        elif not url.startswith(UNTRACKED_URL_PREFIXES):
+            # 외부 URL이나 절대 경로가 아닌 경우만 추적
+            self.unmapped.add(f"{label}: {url}")
+        return new_url
+    
+    def rewrite_resource_attr(self, tag_name, attr, value):
+        """RESOURCE_TAG_ATTRS 속성 값을 재작성 (바뀌지 않으면 None)"""
+        label = f"{tag_name}[{attr}]"
+        if RESOURCE_TAG_ATTRS[tag_name][attr] == 'srcset':
+            new_value = rewrite_srcset(value, lambda url: self.rewrite_url(url, label))
+            if new_value == value:
+                new_value = None
+        else:
+            new_value = self.rewrite_url(value, label)
+        self.preview.append((tag_name, new_value or value))
+        return new_value
+    
+    def rewrite_style(self, style, label="style"):
+        """CSS 텍스트(style 속성, <style> 내용, 스타일시트) 안의 url()과 @import를 재작성하여 반환"""
+        return rewrite_css(style, lambda url, kind: self.rewrite_url(url, f"{label}[{kind}]"))
+
+def _is_stylesheet_link(rel):
+    # rel 키워드는 대소문자를 구분하지 않음
+    return 'stylesheet' in rel.lower().split()
+
+def rewrite_html_soup(content, rewriter, inline_stylesheet=None):
+    """BeautifulSoup 트리로 리소스 경로를 재작성 (스트리밍 엔진의 폴백)"""
+    with rewriter.stats.phase("html_parse", len(content)):
+        soup = BeautifulSoup(content, 'html.parser')
+    with rewriter.stats.phase("rewrite"):
+        _rewrite_soup(soup, rewriter, inline_stylesheet)
+    with rewriter.stats.phase("serialize"):
+        return str(soup)
+
+def _rewrite_soup(soup, rewriter, inline_stylesheet):
+    
+    # CSS 파일을 style 태그로 임베드
+    inlined_styles = []  # 임베드한 CSS는 이미 재작성되어 있으므로 아래 <style> 처리에서 제외
+    if inline_stylesheet:
+        for link in soup.find_all('link', rel=True):
+            if not _is_stylesheet_link(' '.join(link.get_attribute_list('rel'))):
+                continue
+            href = link.get('href')
+            css_content = inline_stylesheet(href) if href else None
+            if css_content is not None:
+                # style 태그 생성 후 link 태그를 교체
+                style_tag = soup.new_tag('style')
+                style_tag.string = css_content
+                link.replace_with(style_tag)
+                inlined_styles.append(style_tag)
+    
+    # 리소스 경로 업데이트
+    for tag in soup.find_all(list(RESOURCE_TAG_ATTRS)):
+        for attr in RESOURCE_TAG_ATTRS[tag.name]:
+            value = tag.get(attr)
+            if value:
+                new_value = rewriter.rewrite_resource_attr(tag.name, attr, value)
+                if new_value is not None:
+                    tag[attr] = new_value
+    
+    # 인라인 스타일의 url() 처리
+    for tag in soup.find_all(style=True):
+        tag['style'] = rewriter.rewrite_style(tag['style'])
+    
+    # <style> 요소 안의 url()과 @import 처리
+    for style_tag in soup.find_all('style'):
+        if style_tag.string and not any(style_tag is inlined for inlined in inlined_styles):
+            style_tag.string = rewriter.rewrite_style(style_tag.string)
+
+# <meta http-equiv="Content-Type" content="...; charset=..."> 의 charset 값
+_META_CONTENT_CHARSET_PATTERN = re.compile(r'((?:^|;)\s*charset=)([^;]*)', re.IGNORECASE)
+
+def _escape_attr(value):
+    return value.replace('&', '&amp;').replace('"', '&quot;')
+
+class _StreamingRewriter(HTMLParser):
+    """트리를 만들지 않고 시작 태그만 검사해서 바뀐 태그를 원문에 덮어쓰는 토크나이저
+    
+    바뀌지 않은 부분은 원문 그대로 유지되므로 재직렬화 비용이 없다.
+    """
+    
+    def __init__(self, rewriter, inline_stylesheet=None):
+        super().__init__(convert_charrefs=False)
+        self.rewriter = rewriter
+        self.inline_stylesheet = inline_stylesheet
+        self.edits = []  # [(시작 오프셋, 원래 길이, 새 텍스트), ...]
+        self._base = 0
+        self._tag_pos = 0
+        self._endtag_pos = 0
+        self._style_start = None  # 열린 <style> 내용의 시작 오프셋
+        self._content = ""
+    
+    def rewrite(self, content):
+        self._content = content
+        with self.rewriter.stats.phase("rewrite", len(content)):
+            self.feed(content)
+            # feed 후 남은 미완성 데이터는 close()에서 잘린 rawdata 기준으로 처리됨
+            self._base = len(content) - len(self.rawdata)
+            self.close()
+        
+        with self.rewriter.stats.phase("serialize"):
+            return self._splice(content)
+    
+    def _splice(self, content):
+        out = []
+        last = 0
+        for pos, length, text in self.edits:
+            out.append(content[last:pos])
+            out.append(text)
+            last = pos + length
+        out.append(content[last:])
+        return ''.join(out)
+    
+    def parse_starttag(self, i):
+        # handle_starttag에서 원문 위치를 알 수 있도록 기록
+        self._tag_pos = i
+        return super().parse_starttag(i)
+    
+    def parse_endtag(self, i):
+        self._endtag_pos = i
+        return super().parse_endtag(i)
+    
+    def handle_startendtag(self, tag, attrs):
+        raw = self.get_starttag_text()
+        if raw is None:
+            return
+        new_text = self._rewrite_tag(tag, attrs, raw)
+        if new_text is not None:
+            self.edits.append((self._base + self._tag_pos, len(raw), new_text))
+    
+    def handle_starttag(self, tag, attrs):
+        self.handle_startendtag(tag, attrs)
+        if tag == 'style' and self.get_starttag_text() is not None:
+            # 내용은 닫는 태그에서 원문 위치로 잘라 한 번에 재작성
+            self._style_start = self._base + self._tag_pos + len(self.get_starttag_text())
+    
+    def handle_endtag(self, tag):
+        if tag != 'style' or self._style_start is None:
+            return
+        start, end = self._style_start, self._base + self._endtag_pos
+        self._style_start = None
+        css = self._content[start:end]
+        new_css = self.rewriter.rewrite_style(css)
+        if new_css != css:
+            self.edits.append((start, end - start, new_css))
+    
+    def _rewrite_tag(self, tag, attrs, raw):
+        values = dict(attrs)
+        
+        # CSS 파일을 style 태그로 임베드
+        if (tag == 'link' and self.inline_stylesheet and values.get('href')
+                and _is_stylesheet_link(values.get('rel') or '')):
+            css_content = self.inline_stylesheet(values['href'])
+            if css_content is not None:
+                return f"<style>{css_content}</style>"
+        
+        replaced = {}  # 속성 이름 -> 새 값
+        if tag == 'meta':
+            # 결과는 항상 UTF-8로 기록되므로 문서의 인코딩 선언도 바꿈 (BeautifulSoup 직렬화와 같은 규칙)
+            if values.get('charset') is not None:
+                if values['charset'].strip().lower() != 'utf-8':
+                    replaced['charset'] = 'utf-8'
+            elif values.get('content') is not None and (values.get('http-equiv') or '').lower() == 'content-type':
+                content = _META_CONTENT_CHARSET_PATTERN.sub(r'\1utf-8', values['content'])
+                if content != values['content']:
+                    replaced['content'] = content
+        for attr in RESOURCE_TAG_ATTRS.get(tag, ()):
+            if values.get(attr):
+                new_value = self.rewriter.rewrite_resource_attr(tag, attr, values[attr])
+                if new_value is not None:
+                    replaced[attr] = new_value
+        
+        if values.get('style'):
+            style = self.rewriter.rewrite_style(values['style'])
+            if style != values['style']:
+                replaced['style'] = style
+        
+        if not replaced:
+            return None
+        attrs = [(name, replaced.get(name, value)) for name, value in attrs]
+        parts = [raw[1:1 + len(tag)]]  # 원래 태그 이름 대소문자 유지
+        for name, value in attrs:
+            parts.append(name if value is None else f'{name}="{_escape_attr(value)}"')
+        end = "/>" if raw.endswith("/>") else ">"
+        return "<" + " ".join(parts) + end
+
+def rewrite_html_stream(content, rewriter, inline_stylesheet=None):
+    """토크나이저 한 번의 패스로 RESOURCE_TAG_ATTRS 속성과 style의 리소스 경로를 재작성"""
+    return _StreamingRewriter(rewriter, inline_stylesheet).rewrite(content)
+
+REWRITE_ENGINES = {
+    "stream": rewrite_html_stream,
+    "soup": rewrite_html_soup,
+}
+
+def rewrite_html(content, rewriter, inline_stylesheet=None, engine="stream"):
+    """HTML의 리소스 경로를 재작성한 문자열을 반환
+    
+    engine이 "stream"이면 토크나이저 기반 단일 패스를 사용하고, 실패하면 BeautifulSoup으로 다시 처리한다.
+    """
+    if engine != "soup":
+        try:
+            return REWRITE_ENGINES[engine](content, rewriter, inline_stylesheet)
+        except Exception as e:
+            logger.warning("%s rewriter failed (%s), falling back to BeautifulSoup", engine, e)
+            rewriter.reset()
+    return rewrite_html_soup(content, rewriter, inline_stylesheet)
+
+# @font-face 규칙 등에서 폰트 파일을 가리키는 url()
+FONT_EXTENSIONS = ('.woff', '.woff2', '.ttf', '.eot', '.otf')
+
+def _split_css_url(url):
+    """CSS에서 가져온 URL을 urlsplit (잘못된 URL이면 None)"""
+    try:
+        return urlsplit(url)
+    except ValueError:
+        return None
+
+def css_font_urls(css):
+    """CSS의 url() 중 웹 폰트 파일을 가리키는 URL 목록 (잘못된 URL은 건너뜀)"""
+    font_urls = []
+    for url, kind in iter_css_urls(css):
+        if kind != 'url()' or url.startswith('data:'):
+            continue
+        parts = _split_css_url(url)
+        if parts is not None and parts.path.lower().endswith(FONT_EXTENSIONS):
+            font_urls.append(url)
+    return font_urls
+
+def _font_extension(content_type):
+    """Content-Type에서 폰트 확장자 추측"""
+    if 'woff2' in content_type:
+        return '.woff2'
+    if 'woff' in content_type:
+        return '.woff'
+    if 'ttf' in content_type or 'truetype' in content_type:
+        return '.ttf'
+    if 'embedded-opentype' in content_type:
+        return '.eot'
+    if 'opentype' in content_type:
+        return '.otf'
+    # 확장자를 추측할 수 없는 경우 woff2 사용
+    return '.woff2'
+
+class FontFetcher:
+    """웹 폰트를 keep-alive 세션 풀로 동시에 내려받고 디스크에 캐시
+    
+    캐시는 URL의 sha256을 이름으로 cache_dir에 본문(.bin)과 메타데이터(.json, ETag 등)를 저장하므로
+    여러 아카이브와 여러 실행 사이에서 공유된다. revalidate=True면 캐시 적중 시에도
+    If-None-Match / If-Modified-Since 조건부 요청으로 갱신 여부를 확인한다.
+    프로세스 내 메모리 캐시는 본문 크기 합이 memory_limit(바이트)을 넘지 않도록 오래 쓰지 않은 것부터 버리고,
+    실패한 다운로드는 다음 요청에서 다시 시도하도록 넣지 않는다.
+    """
+    
+    def __init__(self, cache_dir=None, max_workers=8, timeout=10, retries=2, revalidate=False,
+                 memory_limit=64 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.revalidate = revalidate
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_workers, pool_maxsize=max_workers,
+            max_retries=Retry(total=retries, backoff_factor=0.2,
+                              status_forcelist=(429, 500, 502, 503, 504)),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.memory_limit = memory_limit
+        self._memory = OrderedDict()  # 프로세스 내 LRU 캐시: url -> (content, content_type)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def fetch_all(self, urls):
+        """여러 URL을 동시에 내려받아 {url: (content, content_type) 또는 None}을 반환"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self.fetch, urls)))
+    
+    def fetch(self, url):
+        with self._lock:
+            if url in self._memory:
+                self._memory.move_to_end(url)
+                return self._memory[url]
+        
+        cached, meta = self._read_cache(url)
+        if cached is not None and not self.revalidate:
+            return self._remember(url, cached)
+        
+        headers = {}
+        if cached is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        except requests.RequestException as e:
+            logger.warning("Error downloading font: %s - %s", url, e)
+            # 네트워크 오류 시 오래된 캐시라도 사용
+            return self._remember(url, cached)
+        
+        if response.status_code == 304 and cached is not None:
+            return self._remember(url, cached)
+        if response.status_code != 200:
+            logger.warning("Failed to download font: %s (Status code: %s)", url, response.status_code)
+            return self._remember(url, None)
+        
+        result = (response.content, response.headers.get('Content-Type', ''))
+        self._write_cache(url, result, response.headers)
+        return self._remember(url, result)
+    
+    def _remember(self, url, result):
+        if result is None or len(result[0]) > self.memory_limit:
+            return result
+        with self._lock:
+            previous = self._memory.pop(url, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[0])
+            self._memory[url] = result
+            self._memory_bytes += len(result[0])
+            while self._memory_bytes > self.memory_limit:
+                _, (content, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(content)
+        return result
+    
+    def _cache_paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.bin", self.cache_dir / f"{key}.json"
+    
+    def _read_cache(self, url):
+        if not self.cache_dir:
+            return None, {}
+        body_path, meta_path = self._cache_paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            return (body_path.read_bytes(), meta.get('content_type', '')), meta
+        except (OSError, ValueError):
+            return None, {}
+    
+    def _write_cache(self, url, result, headers):
+        if not self.cache_dir:
+            return
+        body_path, meta_path = self._cache_paths(url)
+        meta = {
+            'url': url,
+            'content_type': result[1],
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+        }
+        # 본문을 먼저 쓰고 메타데이터를 마지막에 원자적으로 교체 (메타데이터가 있으면 캐시 유효)
+        for path, data in ((body_path, result[0]), (meta_path, json.dumps(meta).encode('utf-8'))):
+            tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+_font_fetchers = {}
+
+def get_font_fetcher(cache_dir=None):
+    """프로세스 안에서 cache_dir별로 공유하는 FontFetcher (세션과 크기 제한이 있는 메모리 캐시를 재사용)"""
+    key = str(cache_dir) if cache_dir else None
+    if key not in _font_fetchers:
+        _font_fetchers[key] = FontFetcher(cache_dir)
+    return _font_fetchers[key]
+
+def _file_digest(path):
+    """파일 내용의 sha256 (청크 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_path(mhtml_path):
+    """변환 결과 옆에 두는 매니페스트 파일 경로"""
+    mhtml_path = Path(mhtml_path)
+    return mhtml_path.parent / f"{mhtml_path.stem}.manifest.json"
+
+def read_manifest(mhtml_path):
+    try:
+        return json.loads(manifest_path(mhtml_path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+def is_conversion_current(mhtml_path, options):
+    """매니페스트 기준으로 기존 변환 결과가 최신이면 그 매니페스트를, 아니면 None을 반환
+    
+    입력 크기와 mtime이 같으면 해시 계산 없이 최신으로 판단하고,
+    mtime만 바뀐 경우에는 내용 해시를 비교한다 (해시 없이 기록된 매니페스트면 최신이 아님).
+    """
+    mhtml_path = Path(mhtml_path)
+    manifest = read_manifest(mhtml_path)
+    if not manifest:
+        return None
+    if manifest.get("converter_version") != CONVERTER_VERSION or manifest.get("options") != options:
+        return None
+    if not (mhtml_path.parent / manifest.get("output", "")).is_file():
+        return None
+    file_stat = mhtml_path.stat()
+    source = manifest.get("input", {})
+    if source.get("size") != file_stat.st_size:
+        return None
+    if source.get("mtime_ns") != file_stat.st_mtime_ns:
+        if not source.get("sha256") or source["sha256"] != _file_digest(mhtml_path):
+            return None
+        # 내용은 같고 mtime만 바뀐 경우: 다음 확인 때 해시를 다시 계산하지 않도록 갱신
+        write_manifest(mhtml_path, options, manifest.get("stats"), manifest["output"], digest=source["sha256"])
+    return manifest
+
+def write_manifest(mhtml_path, options, stats, output_name, digest=None):
+    """변환이 끝난 뒤 입력 정보와 옵션, 결과 통계를 매니페스트로 기록
+    
+    digest가 True면 입력 전체를 읽어 내용 해시를 계산하고, 문자열이면 그 값을 해시로 기록한다.
+    해시는 mtime만 바뀐 입력을 증분 변환에서 알아보는 데만 쓰이므로 증분 변환일 때만 계산한다.
+    """
+    mhtml_path = Path(mhtml_path)
+    file_stat = mhtml_path.stat()
+    if digest is True:
+        digest = _file_digest(mhtml_path)
+    manifest = {
+        "converter_version": CONVERTER_VERSION,
+        "options": options,
+        "input": {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns, "sha256": digest or None},
+        "output": output_name,
+        "stats": stats,
+    }
+    path = manifest_path(mhtml_path)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def _max_rss():
+    """프로세스 최대 RSS (바이트, 지원하지 않는 플랫폼은 None)"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+class ConversionStats:
+    """변환 한 건의 단계별 / 콘텐츠 타입별 계측 결과
+    
+    단계(phase)마다 경과 시간, 처리 바이트, 호출 수를 누적한다. trace_memory가 켜져 있고
+    tracemalloc이 동작 중이면 단계와 콘텐츠 타입별 파트 처리 중에 관측된 최대 traced 메모리도 기록한다.
+    hook이 있으면 기록할 때마다 hook(단계 이름, 해당 단계 누적 기록)을 호출한다.
+    """
+    
+    def __init__(self, trace_memory=False, hook=None):
+        self.phases = {}  # 단계 이름 -> {"seconds", "bytes", "calls", "peak_memory"}
+        self.content_types = {}  # Content-Type -> {"parts", "bytes", "seconds", "peak_memory"}
+        self.trace_memory = trace_memory
+        self.hook = hook
+        self._peak_stack = []  # 중첩된 단계의 최대 메모리 (reset_peak 전에 보존)
+    
+    def add(self, name, seconds, nbytes=0, peak_memory=0):
+        entry = self.phases.setdefault(name, {"seconds": 0.0, "bytes": 0, "calls": 0, "peak_memory": 0})
+        entry["seconds"] += seconds
+        entry["bytes"] += nbytes
+        entry["calls"] += 1
+        entry["peak_memory"] = max(entry["peak_memory"], peak_memory)
+        if self.hook:
+            self.hook(name, dict(entry))
+    
+    @contextlib.contextmanager
+    def measure_peak(self):
+        """with 블록 안의 최대 traced 메모리를 yield되는 dict의 "peak_memory"에 기록 (중첩 가능)"""
+        measured = {"peak_memory": 0}
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            if self._peak_stack:
+                self._peak_stack[-1] = max(self._peak_stack[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peak_stack.append(0)
+        try:
+            yield measured
+        finally:
+            if tracing:
+                measured["peak_memory"] = max(tracemalloc.get_traced_memory()[1], self._peak_stack.pop())
+                if self._peak_stack:
+                    self._peak_stack[-1] = max(self._peak_stack[-1], measured["peak_memory"])
+    
+    @contextlib.contextmanager
+    def phase(self, name, nbytes=0):
+        """with 블록의 시간을 name 단계에 누적 (yield되는 dict의 "bytes"로 처리 바이트 지정)"""
+        measured = {"bytes": nbytes}
+        start = time.perf_counter()
+        memory = {"peak_memory": 0}
+        try:
+            with self.measure_peak() as memory:
+                yield measured
+        finally:
+            self.add(name, time.perf_counter() - start, measured["bytes"], memory["peak_memory"])
+    
+    def merge(self, phases):
+        """다른 ConversionStats의 단계 기록(phases)을 누적 (풀에서 따로 계측한 프레임 등)"""
+        for name, other in phases.items():
+            entry = self.phases.setdefault(name, {"seconds": 0.0, "bytes": 0, "calls": 0, "peak_memory": 0})
+            entry["seconds"] += other["seconds"]
+            entry["bytes"] += other["bytes"]
+            entry["calls"] += other["calls"]
+            entry["peak_memory"] = max(entry["peak_memory"], other["peak_memory"])
+            if self.hook:
+                self.hook(name, dict(entry))
+    
+    def add_content_type(self, content_type, nbytes, seconds, peak_memory=0):
+        entry = self.content_types.setdefault(content_type,
+                                              {"parts": 0, "bytes": 0, "seconds": 0.0, "peak_memory": 0})
+        entry["parts"] += 1
+        entry["bytes"] += nbytes
+        entry["seconds"] += seconds
+        entry["peak_memory"] = max(entry["peak_memory"], peak_memory)
+    
+    def timings(self, names=("parts", "fonts", "html", "frames")):
+        """주요 단계의 경과 시간 (요약 이벤트용)"""
+        return {name: round(self.phases[name]["seconds"], 6) for name in names if name in self.phases}
+    
+    def as_dict(self):
+        return {
+            "phases": {name: dict(entry, seconds=round(entry["seconds"], 6)) for name, entry in self.phases.items()},
+            "content_types": {content_type: dict(entry, seconds=round(entry["seconds"], 6))
+                              for content_type, entry in self.content_types.items()},
+            "max_rss": _max_rss(),
+        }
+
+def aggregate_profiles(records, totals=None):
+    """배치 결과 레코드의 profile 통계를 단계별 / 콘텐츠 타입별로 totals에 합산하여 반환
+    
+    레코드를 모두 모아둘 필요 없이 완료될 때마다 같은 totals를 넘겨 누적할 수 있다.
+    """
+    if totals is None:
+        totals = {"files": 0, "phases": {}, "content_types": {}, "slowest": []}
+    for record in records:
+        profile = (record.get("stats") or {}).get("profile")
+        if not profile:
+            continue
+        totals["files"] += 1
+        for name, entry in profile["phases"].items():
+            total = totals["phases"].setdefault(name, {"seconds": 0.0, "bytes": 0, "calls": 0, "peak_memory": 0})
+            total["seconds"] += entry["seconds"]
+            total["bytes"] += entry["bytes"]
+            total["calls"] += entry["calls"]
+            total["peak_memory"] = max(total["peak_memory"], entry["peak_memory"])
+        for content_type, entry in profile["content_types"].items():
+            total = totals["content_types"].setdefault(content_type,
+                                                       {"parts": 0, "bytes": 0, "seconds": 0.0, "peak_memory": 0})
+            total["parts"] += entry["parts"]
+            total["bytes"] += entry["bytes"]
+            total["seconds"] += entry["seconds"]
+            total["peak_memory"] = max(total["peak_memory"], entry.get("peak_memory", 0))
+        # 가장 오래 걸린 파일 상위 10개 (병적인 아카이브 확인용)
+        totals["slowest"] = heapq.nlargest(10, totals["slowest"] + [(record["elapsed"], record["path"])])
+    return totals
+
+def format_profile_report(totals):
+    """aggregate_profiles 결과를 사람이 읽을 수 있는 표로 변환"""
+    lines = [f"Profile of {totals['files']} files", "",
+             f"{'phase':<12}{'seconds':>12}{'MB':>12}{'calls':>10}{'peak MB':>10}"]
+    for name, entry in sorted(totals["phases"].items(), key=lambda item: -item[1]["seconds"]):
+        lines.append(f"{name:<12}{entry['seconds']:>12.3f}{entry['bytes'] / 1e6:>12.2f}"
+                     f"{entry['calls']:>10}{entry['peak_memory'] / 1e6:>10.2f}")
+    lines += ["", f"{'content type':<32}{'parts':>8}{'MB':>12}{'seconds':>12}{'peak MB':>10}"]
+    for content_type, entry in sorted(totals["content_types"].items(), key=lambda item: -item[1]["seconds"]):
+        lines.append(f"{content_type:<32}{entry['parts']:>8}{entry['bytes'] / 1e6:>12.2f}{entry['seconds']:>12.3f}"
+                     f"{entry['peak_memory'] / 1e6:>10.2f}")
+    lines += ["", "slowest files:"]
+    lines += [f"  {elapsed:8.3f}s  {path}" for elapsed, path in totals["slowest"]]
+    return "\n".join(lines)
+
+# 미리 압축한 사본(.gz/.br)을 만들 출력 파일 확장자 (이미지, woff/woff2 등 이미 압축된 형식은 제외)
+PRECOMPRESS_SUFFIXES = {'.html', '.css', '.js', '.mjs', '.json', '.svg', '.xml', '.txt', '.ttf', '.otf', '.eot'}
+PRECOMPRESS_MIN_SIZE = 1024  # 이보다 작은 파일은 압축하지 않음 (바이트)
+GZIP_LEVEL = 9
+PRECOMPRESS_VARIANTS = ('.gz', '.br')
+BROTLI_QUALITY = 11
+
+def precompress_file(path):
+    """path 옆에 .gz (brotli가 있으면 .br도) 사본을 만들고 만든 경로 목록을 반환
+    
+    정적 파일 서버가 요청마다 압축하지 않도록 최대 압축률로 한 번만 만든다. 원본보다 작아지지 않으면
+    사본을 남기지 않는다. 임시 파일에 쓴 뒤 교체하므로 서버가 덜 쓴 사본을 내보내는 일이 없다.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    outputs = []
+    variants = [(".gz", None)]
+    if brotli is not None:
+        variants.append((".br", brotli.Compressor(quality=BROTLI_QUALITY)))
+    else:
+        # brotli가 있던 이전 실행의 사본 제거
+        path.with_name(path.name + ".br").unlink(missing_ok=True)
+    for suffix, compressor in variants:
+        target = path.with_name(path.name + suffix)
+        tmp_path = path.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                if compressor is None:
+                    # mtime=0: 같은 입력이면 항상 같은 바이트
+                    with gzip.GzipFile(filename="", mode='wb', fileobj=dst, compresslevel=GZIP_LEVEL, mtime=0) as gz:
+                        shutil.copyfileobj(src, gz, CHUNK_SIZE)
+                else:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        dst.write(compressor.process(chunk))
+                    dst.write(compressor.finish())
+            if tmp_path.stat().st_size < size:
+                os.replace(tmp_path, target)
+                outputs.append(target)
+            else:
+                tmp_path.unlink()
+                target.unlink(missing_ok=True)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    return outputs
+
+class DirectorySink:
+    """output_dir 아래에 파일로 기록하는 출력 싱크 (parse_mhtml_file의 기본 출력)
+    
+    모든 경로는 출력 루트 기준의 '/' 구분 상대 경로다. 디렉토리는 처음 쓸 때 한 번만 만든다.
+    store_dir를 지정하면 공유 가능한 리소스(shareable=True)는 store_payload로 내용 해시 이름의
+    공유 저장소에 한 번만 기록하고, store_link가 "hardlink"면 출력 디렉토리에 하드링크를 만들고
+    "relative"면 저장소 파일의 상대 경로를 그대로 참조 경로로 돌려준다.
+    precompress가 True면 PRECOMPRESS_SUFFIXES 형식이면서 precompress_min_size 이상인 파일마다
+    precompress_file을 스레드 풀에 넘겨 변환과 병렬로 .gz/.br 사본을 만들고, close()에서 모두 기다린다.
+    공유 저장소에 직접 있는 파일(store_link="relative")은 압축하지 않는다.
+    """
+    
+    def __init__(self, output_dir, store_dir=None, store_link="hardlink", precompress=False,
+                 precompress_min_size=PRECOMPRESS_MIN_SIZE):
+        self.output_dir = Path(output_dir)
+        self.store_dir = store_dir
+        self.store_link = store_link
+        self._created_dirs = set()
+        self.precompress_min_size = precompress_min_size
+        # 압축은 zlib/brotli가 GIL을 놓고 수행하므로 스레드로도 병렬 처리된다
+        self._compressor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) if precompress else None
+        self._compress_jobs = []
+        self.precompressed = []  # 만든 사본 경로 (출력 루트 기준, close() 이후 채워짐)
+    
+    def _precompress(self, path, size):
+        if PurePosixPath(path).suffix.lower() not in PRECOMPRESS_SUFFIXES:
+            return
+        target = self.output_dir / path
+        if self._compressor is None or size < self.precompress_min_size:
+            # 재실행하면 같은 이름에 기록되므로 이전 실행의 사본이 남아 있으면 옛 내용이 서비스됨
+            for suffix in PRECOMPRESS_VARIANTS:
+                target.with_name(target.name + suffix).unlink(missing_ok=True)
+            return
+        self._compress_jobs.append(self._compressor.submit(precompress_file, target))
+    
+    def _target(self, path):
+        target = self.output_dir / path
+        if target.parent not in self._created_dirs:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(target.parent)
+        return target
+    
+    def write_stream(self, path, chunks, shareable=False, reread=None):
+        """청크를 path에 기록하고 페이지에서 참조할 경로를 반환
+        
+        reread는 같은 청크를 처음부터 다시 만드는 함수로, 공유 저장소가 이미 있는 내용을 쓰지 않는 데 쓴다.
+        """
+        if shareable and self.store_dir is not None:
+            store_path = store_payload(chunks, self.store_dir, PurePosixPath(path).suffix, reread)
+            if self.store_link == "relative":
+                return os.path.relpath(store_path, self.output_dir).replace('\\', '/')
+            link_path = link_stored_payload(store_path, self._target(path).parent)
+            link_path = link_path.relative_to(self.output_dir).as_posix()
+            self._precompress(link_path, store_path.stat().st_size)
+            return link_path
+        size = 0
+        with open(self._target(path), 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        self._precompress(path, size)
+        return path
+    
+    def write_bytes(self, path, data):
+        return self.write_stream(path, [data])
+    
+    def close(self):
+        if self._compressor is None:
+            return
+        try:
+            for job in self._compress_jobs:
+                self.precompressed += [target.relative_to(self.output_dir).as_posix() for target in job.result()]
+        finally:
+            self._compressor.shutdown(cancel_futures=True)
+
+class MemorySink:
+    """변환 결과를 {경로: bytes}로 메모리에 보관하는 출력 싱크 (디스크를 건드리지 않음)"""
+    
+    def __init__(self):
+        self.files = {}
+    
+    def write_stream(self, path, chunks, shareable=False, reread=None):
+        self.files[path] = b"".join(chunks)
+        return path
+    
+    def write_bytes(self, path, data):
+        return self.write_stream(path, [data])
+    
+    def close(self):
+        pass
+
+# 아카이브 출력 형식 -> 파일 확장자
+ARCHIVE_FORMATS = {
+    "zip": ".zip",
+    "tar": ".tar",
+    "tar.gz": ".tar.gz",
+    "tar.bz2": ".tar.bz2",
+    "tar.xz": ".tar.xz",
+}
+# 다시 압축해도 줄지 않는 형식 (zip에 압축 없이 저장)
+PRECOMPRESSED_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.woff', '.woff2'}
+# tar 멤버를 모을 때 메모리에 두는 최대 크기 (넘으면 임시 파일 사용)
+TAR_SPOOL_SIZE = 64 * 1024 * 1024
+
+class ZipSink:
+    """zip 아카이브에 순차적으로 기록하는 출력 싱크
+    
+    archive는 경로, 쓰기 가능한 바이너리 파일 객체(탐색할 수 없는 스트림 포함), 또는 이미 열린 ZipFile이다.
+    열린 ZipFile을 넘기면 여러 변환이 prefix만 달리하여 같은 아카이브를 공유하며, close()는 이를 닫지 않는다.
+    """
+    
+    def __init__(self, archive, prefix="", compression=zipfile.ZIP_DEFLATED):
+        self._owned = not isinstance(archive, zipfile.ZipFile)
+        self.zip = zipfile.ZipFile(archive, "w", compression=compression) if self._owned else archive
+        self.prefix = prefix
+    
+    def write_stream(self, path, chunks, shareable=False, reread=None):
+        info = zipfile.ZipInfo(self.prefix + path, date_time=time.localtime()[:6])
+        info.external_attr = 0o644 << 16
+        if PurePosixPath(path).suffix.lower() in PRECOMPRESSED_SUFFIXES:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = self.zip.compression
+        with self.zip.open(info, "w") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return path
+    
+    def write_bytes(self, path, data):
+        return self.write_stream(path, [data])
+    
+    def close(self):
+        if self._owned:
+            self.zip.close()
+
+class TarSink:
+    """tar 아카이브(선택적으로 gz/bz2/xz 압축)에 순차적으로 기록하는 출력 싱크
+    
+    아카이브는 스트림 모드("w|")로 열어 앞에서부터 차례로만 쓴다. tar 헤더에는 멤버 크기가 먼저
+    들어가므로 멤버 하나씩 메모리에 모았다가 기록한다 (TAR_SPOOL_SIZE를 넘는 멤버만 임시 파일 사용).
+    archive와 prefix는 ZipSink와 같다 (열린 TarFile을 넘기면 공유).
+    """
+    
+    def __init__(self, archive, prefix="", compression=""):
+        self._owned = not isinstance(archive, tarfile.TarFile)
+        if not self._owned:
+            self.tar = archive
+        elif isinstance(archive, (str, os.PathLike)):
+            self.tar = tarfile.open(os.fspath(archive), f"w|{compression}")
+        else:
+            self.tar = tarfile.open(fileobj=archive, mode=f"w|{compression}")
+        self.prefix = prefix
+    
+    def _add(self, path, size, fileobj):
+        info = tarfile.TarInfo(self.prefix + path)
+        info.size = size
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        self.tar.addfile(info, fileobj)
+    
+    def write_stream(self, path, chunks, shareable=False, reread=None):
+        with tempfile.SpooledTemporaryFile(max_size=TAR_SPOOL_SIZE) as buffer:
+            for chunk in chunks:
+                buffer.write(chunk)
+            size = buffer.tell()
+            buffer.seek(0)
+            self._add(path, size, buffer)
+        return path
+    
+    def write_bytes(self, path, data):
+        self._add(path, len(data), io.BytesIO(data))
+        return path
+    
+    def close(self):
+        if self._owned:
+            self.tar.close()
+
+def archive_format_for(path):
+    """파일 이름의 확장자로 아카이브 형식을 추측"""
+    name = str(path).lower()
+    for archive_format, suffix in sorted(ARCHIVE_FORMATS.items(), key=lambda item: -len(item[1])):
+        if name.endswith(suffix):
+            return archive_format
+    raise ValueError(f"Unknown archive format: {path} (expected one of {', '.join(ARCHIVE_FORMATS.values())})")
+
+def open_archive_sink(archive, archive_format, prefix=""):
+    """archive_format("zip", "tar", "tar.gz" 등)에 맞는 아카이브 출력 싱크를 연다"""
+    if archive_format == "zip":
+        return ZipSink(archive, prefix)
+    if archive_format in ARCHIVE_FORMATS:
+        return TarSink(archive, prefix, archive_format.partition(".")[2])
+    raise ValueError(f"Unknown archive format: {archive_format}")
+
+@contextlib.contextmanager
+def open_mhtml_buffer(source):
+    """경로, bytes 류, 바이너리 파일 객체를 iter_mhtml_parts에 넘길 버퍼로 연다
+    
+    일반 파일이면 mmap으로 열고, 그 외의 파일 객체(파이프, 소켓 등)는 전체를 읽는다.
+    """
+    if isinstance(source, memoryview):
+        source = source.tobytes()
+    if isinstance(source, (bytes, bytearray)):
+        if not source:
+            raise ValueError("Empty MHTML content")
+        yield source
+        return
     
-    # 리소스 디렉토리 생성 (MHTML 파일 위치 기준)
-    resource_dir = output_dir / "resource"
-    image_dir = resource_dir / "image"
-    css_dir = resource_dir / "css"
-    js_dir = resource_dir / "javascript"
-    html_dir = resource_dir / "html"
-    font_dir = resource_dir / "font"
+    f = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        try:
+            fileno = f.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fileno = None
+        # 파이프와 소켓은 fileno가 있어도 크기가 0으로 보이고 mmap할 수 없음
+        if fileno is None or not stat.S_ISREG(os.fstat(fileno).st_mode):
+            data = f.read()
+            if not data:
+                raise ValueError("Empty MHTML content")
+            yield data
+            return
+        if os.fstat(fileno).st_size == 0:
+            raise ValueError(f"Empty MHTML file: {getattr(f, 'name', source)}")
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+    finally:
+        if f is not source:
+            f.close()
+
+# 통계적 인코딩 감지에 넘길 최대 바이트 수와 <meta charset>을 찾을 문서 앞부분 크기 (HTML 표준의 prescan 범위)
+CHARSET_SAMPLE_SIZE = 64 * 1024
+META_SNIFF_SIZE = 1024
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([-\w.:]+)', re.IGNORECASE)
+# 브라우저가 상위 호환 인코딩으로 해석하는 레이블 (WHATWG Encoding 표준)
+CHARSET_ALIASES = {
+    'euc-kr': 'cp949',
+    'ks_c_5601-1987': 'cp949',
+    'gb2312': 'gbk',
+    'shift_jis': 'cp932',
+    'iso-8859-1': 'cp1252',
+    'latin1': 'cp1252',
+    'us-ascii': 'cp1252',
+}
+FALLBACK_ENCODINGS = ('cp1252', 'iso-8859-1', 'cp949', 'euc-kr')
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+def _normalize_charset(charset):
+    """charset 레이블을 파이썬 코덱 이름으로 바꿈 (알 수 없으면 None)"""
+    if not charset:
+        return None
+    if isinstance(charset, bytes):
+        charset = charset.decode('ascii', errors='ignore')
+    charset = charset.strip().strip('"\'').lower()
+    charset = CHARSET_ALIASES.get(charset, charset)
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return None
+
+class CharsetDetector:
+    """아카이브 하나의 HTML 파트들을 디코딩할 문자 인코딩을 결정
+    
+    BOM, MIME 파트의 charset 파라미터, 문서 앞부분의 <meta charset>, UTF-8 순서로 시도하고,
+    모두 실패하면 앞부분 sample_size 바이트만 통계적으로 감지한다 (cchardet가 설치되어 있으면 사용).
+    한 번 감지한 인코딩은 같은 아카이브의 다른 HTML 파트(프레임)에서 감지보다 먼저 재사용한다.
+    """
+    
+    def __init__(self, sample_size=CHARSET_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.archive_encoding = None
     
-    # 필요한 디렉토리 생성
-    for dir_path in [resource_dir, image_dir, css_dir, js_dir, html_dir, font_dir]:  # font_dir 추가
-        dir_path.mkdir(exist_ok=True)
+    def _sniff_meta(self, payload):
+        match = META_CHARSET_PATTERN.search(payload, 0, META_SNIFF_SIZE)
+        encoding = _normalize_charset(match.group(1)) if match else None
+        # 바이트 단위로 찾은 meta가 UTF-16을 가리키면 실제로는 ASCII 호환 인코딩 (HTML 표준)
+        return 'utf-8' if encoding and encoding.startswith('utf-16') else encoding
+    
+    def _detect(self, payload):
+        detector = fast_chardet or chardet
+        return _normalize_charset(detector.detect(bytes(payload[:self.sample_size])).get('encoding'))
+    
+    def _candidates(self, payload, declared):
+        for bom, encoding in BOMS:
+            if payload.startswith(bom):
+                yield encoding
+                return
+        yield _normalize_charset(declared)
+        yield self._sniff_meta(payload)
+        yield 'utf-8'
+        yield self.archive_encoding
+        detected = self._detect(payload)
+        self.archive_encoding = self.archive_encoding or detected
+        yield detected
+        yield from FALLBACK_ENCODINGS
+    
+    def decode(self, payload, declared=None):
+        """payload를 디코딩하여 (문자열, 사용한 인코딩)을 반환"""
+        tried = set()
+        for encoding in self._candidates(payload, declared):
+            if not encoding or encoding in tried:
+                continue
+            tried.add(encoding)
+            try:
+                return payload.decode(encoding), encoding
+            except UnicodeDecodeError:
+                continue
+        return payload.decode('utf-8', errors='replace'), 'utf-8'
+
+# 건너뛴 파트 참조를 대체할 자리표시자 (이미지는 투명 1x1 GIF, 나머지는 빈 data: URI)
+PLACEHOLDER_IMAGE = "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+PLACEHOLDER_EMPTY = "data:,"
+SKIPPED_REFERENCE_MODES = ("original", "placeholder")
+
+class ExtractionPolicy:
+    """디코딩/기록할 파트를 고르는 추출 정책 (파트 본문을 디코딩하기 전에 적용)
+    
+    include / exclude는 Content-Type 패턴 목록 ("image/*", "text/css" 등, fnmatch 문법)으로,
+    include가 있으면 일치하는 타입만 추출하고 exclude에 일치하는 타입은 제외한다.
+    max_part_size는 인코딩된 본문 크기 상한 (바이트), drop_scripts는 스크립트 파트 제외 여부.
+    메인 HTML 문서는 정책과 관계없이 항상 추출한다.
+    skipped_references가 "original"이면 건너뛴 파트를 가리키는 참조를 원래 URL 그대로 두고,
+    "placeholder"면 자리표시자 data: URI로 바꾼다.
+    """
+    
+    def __init__(self, include=None, exclude=None, max_part_size=None, drop_scripts=False,
+                 skipped_references="original"):
+        if skipped_references not in SKIPPED_REFERENCE_MODES:
+            raise ValueError(f"Unknown skipped reference mode: {skipped_references}")
+        self.include = tuple(pattern.lower() for pattern in include or ())
+        self.exclude = tuple(pattern.lower() for pattern in exclude or ())
+        self.max_part_size = max_part_size
+        self.drop_scripts = drop_scripts
+        self.skipped_references = skipped_references
+    
+    @classmethod
+    def html_only(cls, skipped_references="original"):
+        """HTML 파트(메인 문서와 프레임)만 추출하는 정책"""
+        return cls(include=["text/html"], skipped_references=skipped_references)
+    
+    def allows_type(self, content_type):
+        content_type = content_type.lower()
+        if self.drop_scripts and ('javascript' in content_type or 'ecmascript' in content_type):
+            return False
+        if self.include and not any(fnmatch.fnmatchcase(content_type, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatch.fnmatchcase(content_type, pattern) for pattern in self.exclude)
+    
+    def allows(self, part):
+        """파트를 추출할지 여부 (헤더와 본문 크기만 보고 판단)"""
+        if self.max_part_size is not None and part.body_end - part.body_start > self.max_part_size:
+            return False
+        return self.allows_type(part.get_content_type())
+    
+    def placeholder(self, content_type):
+        """건너뛴 파트를 가리키는 참조를 바꿀 URL (원래 URL을 유지하면 None)"""
+        if self.skipped_references != "placeholder":
+            return None
+        return PLACEHOLDER_IMAGE if content_type.startswith('image/') else PLACEHOLDER_EMPTY
+    
+    def as_dict(self):
+        """매니페스트에 기록할 정책 설정"""
+        return {
+            "include": list(self.include),
+            "exclude": list(self.exclude),
+            "max_part_size": self.max_part_size,
+            "drop_scripts": self.drop_scripts,
+            "skipped_references": self.skipped_references,
+        }
+
+def data_uri(data, content_type):
+    """바이트를 base64 data: URI로 변환"""
+    return f"data:{content_type or 'application/octet-stream'};base64,{base64.b64encode(data).decode('ascii')}"
+
+def rewrite_html_part(payload, resource_index, base_url=None, charset=None, engine="stream", document_dir="",
+                      inline_stylesheet=None, charset_detector=None, stats=None, embed=None):
+    """HTML 파트 하나를 디코딩하고 리소스 경로를 재작성하여 (HTML 문자열, ResourceRewriter)를 반환
+    
+    메인 문서와 프레임이 함께 사용한다. charset은 MIME 파트의 charset 파라미터,
+    document_dir는 결과가 기록될 디렉토리, embed는 data: URI로 대신 참조할 경로를 정하는 함수다
+    (ResourceRewriter 참고).
+    """
+    charset_detector = charset_detector or CharsetDetector()
+    stats = stats if stats is not None else ConversionStats()
+    with stats.phase("charset", len(payload)):
+        content, encoding = charset_detector.decode(payload, charset)
+    logger.debug("HTML encoding: %s (%s)", encoding, base_url)
+    rewriter = ResourceRewriter(resource_index, base_url, stats, document_dir, embed)
+    return rewrite_html(content, rewriter, inline_stylesheet, engine=engine), rewriter
+
+# 프로세스 풀 워커에 설치되는 프레임 재작성 컨텍스트 (resource_index, engine, archive_encoding)
+_frame_context = None
+
+def _init_frame_worker(resource_index, engine, archive_encoding):
+    global _frame_context
+    _frame_context = (resource_index, engine, archive_encoding)
+
+def _rewrite_frame(job, context=None):
+    """프레임 하나를 재작성 (스레드/프로세스 풀에서 실행)
+    
+    job은 (payload, save_path, base_url, charset), context는 (resource_index, engine, archive_encoding)으로
+    메인 문서 처리 후의 고정된 스냅샷이다. 프레임끼리 공유하는 상태를 바꾸지 않으므로 병렬로 실행해도
+    결과가 순차 처리와 같다.
+    반환값: (HTML 문자열 또는 None, 교체 수, 미매핑 리소스, 단계 기록, 오류 메시지 또는 None)
+    """
+    payload, save_path, base_url, charset = job
+    resource_index, engine, archive_encoding = context or _frame_context
+    charset_detector = CharsetDetector()
+    charset_detector.archive_encoding = archive_encoding
+    stats = ConversionStats()
+    try:
+        processed, rewriter = rewrite_html_part(payload, resource_index, base_url, charset, engine,
+                                                posixpath.dirname(save_path), charset_detector=charset_detector,
+                                                stats=stats)
+    except Exception as e:
+        return None, 0, set(), stats.phases, f"{type(e).__name__}: {e}"
+    return processed, rewriter.replacement_count, rewriter.unmapped, stats.phases, None
+
+FRAME_EXECUTORS = ("thread", "process")
+
+# 리소스 종류별 출력 디렉토리 (출력 루트 기준)
+RESOURCE_DIRS = {
+    "image": "resource/image",
+    "css": "resource/css",
+    "javascript": "resource/javascript",
+    "html": "resource/html",
+    "font": "resource/font",
+}
+
+# 리소스 종류별로 원래 파일명에서 유지할 확장자
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg')
+
+# 읽을 수 있는 파일명 stem에 남길 문자
+_READABLE_STEM_PATTERN = re.compile(r"[^A-Za-z0-9_.-]+")
+
+class FilenameAllocator:
+    """아카이브 하나의 출력 파일명을 메모리에서 할당 (파일 시스템을 조회하지 않음)
+    
+    이름은 파트를 식별하는 키(Content-Location, Content-ID 등)의 SHA-256 앞 8자리에 확장자를 붙인 것이라
+    같은 아카이브는 실행할 때마다 같은 이름을 얻는다. readable이 True면 원래 파일명의 stem을 앞에 붙인다.
+    같은 디렉토리에서 이름이 겹치면 (대소문자 무시) -2, -3, ...을 붙여 충돌을 없앤다.
+    """
+    
+    def __init__(self, readable=False):
+        self.readable = readable
+        self.used = set()  # (디렉토리, 소문자 파일명)
+    
+    def allocate(self, directory, key, filename="", extensions=(), default_ext=""):
+        """directory 안에서 겹치지 않는 파일명을 반환
+        
+        filename의 확장자가 extensions 중 하나면 유지하고, 아니면 default_ext를 붙인다.
+        """
+        stem, ext = posixpath.splitext(filename)
+        ext = ext.lower() if ext.lower() in extensions else default_ext
+        name = hashlib.sha256(key.encode('utf-8', errors='surrogatepass')).hexdigest()[:8]
+        if self.readable:
+            stem = _READABLE_STEM_PATTERN.sub("-", unquote(stem)).strip("-._")[:40]
+            if stem:
+                name = f"{stem}-{name}"
+        candidate = f"{name}{ext}"
+        suffix = 1
+        while (directory, candidate.lower()) in self.used:
+            suffix += 1
+            candidate = f"{name}-{suffix}{ext}"
+        self.used.add((directory, candidate.lower()))
+        return candidate
+
+def convert_mhtml(source, sink, output_name="index.html", download_fonts=False, rewrite_engine="stream",
+                  font_cache_dir=None, profile=False, profile_hook=None, source_name=None, inline_limit=None,
+                  frame_workers=1, frame_executor="thread", policy=None, readable_names=False):
+    """MHTML을 변환해 결과를 sink에 기록하고 결과 요약 dict를 반환
+    
+    source는 파일 경로, bytes 류, 바이너리 파일 객체 중 하나다 (open_mhtml_buffer 참고).
+    메인 HTML은 output_name에, 리소스는 RESOURCE_DIRS 아래에 기록된다.
+    반환값: {"html": 메인 HTML 경로 (없으면 None), "frames": [추가 HTML 경로], "resources": [리소스 경로],
+             "mapping": {"resources", "cids", "unmapped"}, "stats": 변환 통계}
+    inline_limit(바이트)을 지정하면 단일 파일 모드로 동작한다: 메인 문서의 스타일시트는 url()까지
+    재작성하여 style 태그로 임베드하고, 크기가 inline_limit 이하인 이미지/폰트/스크립트는 별도 파일 대신
+    메모리의 페이로드로 만든 data: URI로 참조한다. @import로 가져오는 스타일시트도 재작성 후 inline_limit
+    이하이면 data:text/css URI로 넣는다. 다만 data: URI 안의 상대 경로는 해석되지 않으므로, 파일로 남은
+    리소스를 참조하는 스타일시트는 파일로 기록한다. 더 큰 리소스와 프레임도 그대로 파일로 기록한다.
+    frame_workers가 1보다 크면 추가 HTML 파트(프레임)를 frame_executor("thread" 또는 "process") 풀로
+    나눠 재작성한다 (_rewrite_frame 참고). 결과는 항상 파트 순서대로 기록된다.
+    policy(ExtractionPolicy)를 지정하면 제외된 파트는 디코딩하지 않고 건너뛴다 (기본값: 모두 추출).
+    리소스 파일명은 FilenameAllocator가 정하며, readable_names가 True면 원래 파일명을 앞에 남긴다.
+    나머지 인자는 parse_mhtml_file과 같다.
+    """
+    # 메모리 계측은 tracemalloc을 켠 뒤 같은 인자로 다시 호출해 수행 (예외가 나도 반드시 종료)
+    if profile and not tracemalloc.is_tracing():
+        arguments = dict(locals())
+        tracemalloc.start()
+        try:
+            return convert_mhtml(**arguments)
+        finally:
+            tracemalloc.stop()
+    
+    global DOWNLOAD_FONTS
+    policy = policy or ExtractionPolicy()
+    # 폰트를 추출하지 않는 정책이면 웹 폰트도 내려받지 않음
+    DOWNLOAD_FONTS = download_fonts and policy.allows_type("font/woff2")
+    source_name = source_name or (str(source) if isinstance(source, (str, os.PathLike)) else "<memory>")
     
     # 리소스 매핑 딕셔너리
     resource_mapping = {}
     html_saved = False
     html_content = None  # HTML 컨텐츠를 저장할 변수 추가
+    html_location = None  # 메인 HTML의 Content-Location (상대 URL 해석 기준)
+    html_charset = None  # 메인 HTML 파트의 charset 파라미터
+    charset_detector = CharsetDetector()  # 아카이브의 모든 HTML 파트가 공유하는 인코딩 결정
+    filenames = FilenameAllocator(readable_names)  # 출력 파일명 할당 (결정적, 충돌 없음)
+    resource_index = None  # 모든 리소스 저장 후 만드는 URL 조회 인덱스
     
     # Content-ID 매핑을 위한 딕셔너리 추가
     cid_mapping = {}
     
     # 추가 HTML 파일들을 저장할 리스트
-    additional_html_files = []  # [(payload, save_path, original_path, content_id), ...]
+    additional_html_files = []  # [(payload, save_path, original_path, content_id, charset), ...]
     
     # 전체 리소스 교체 카운터
     total_replacement_count = 0
     
-    def sanitize_filename(filename):
-        # UUID 생성
-        sanitized_name = str(uuid.uuid4())[:8]
-        # 최종 파일명 생성 (UUID + 확장자)
-        final_name = f"{sanitized_name}"
-        
-        # 파일이 이미 존재하는지 확인하고, 존재하면 파일이름 생성을 다시 시도
-        while os.path.exists(final_name):
-            sanitized_name = str(uuid.uuid4())[:8]
-            final_name = f"{sanitized_name}"
-        return final_name
-
-    def download_web_font(font_url, base_url=None):
-        """웹 폰트를 다운로드하고 로컬에 저장"""
-        if not DOWNLOAD_FONTS:
-            print(f"Font download skipped (disabled): {font_url}")
-            return None
-            
+    # 변환 결과 통계 (배치 드라이버에서 결과 레코드로 사용)
+    part_count = 0
+    unmapped_resources = set()
+    skipped_parts = []  # 추출 정책으로 건너뛴 파트의 Content-Location / Content-ID
+    
+    # CSS 내용 (메인 HTML에 임베드되지 않은 것만 마지막에 기록)
+    css_texts = {}  # 경로 -> CSS 문자열
+    css_locations = {}  # 경로 -> CSS의 Content-Location (CSS 안의 상대 URL 해석 기준)
+    inlined_css = {}  # href -> 임베드된 CSS (재작성 엔진 폴백 시 재사용)
+    embedded_css = set()  # style 태그나 data: URI로 들어가 파일로 기록하지 않는 CSS 경로
+    css_uris = {}  # CSS 경로 -> data: URI (단일 파일 모드의 @import 대상, 넣을 수 없으면 None)
+    
+    # 폰트 다운로드를 기다리는 CSS 파일들
+    pending_font_css = []  # [(base_url, font_urls), ...]
+    
+    # 요약 이벤트용 기록 바이트 수와 단계별 계측
+    bytes_written = 0
+    written_paths = []
+    conversion_stats = ConversionStats(trace_memory=profile, hook=profile_hook)
+    
+    def count_written(chunks, measured):
+        """기록한 바이트 수를 세고, 청크를 만드는 데 걸린 시간(디코딩)을 measured에 누적"""
+        nonlocal bytes_written
+        chunks = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            measured["decode"] += time.perf_counter() - start
+            if chunk is None:
+                return
+            bytes_written += len(chunk)
+            measured["bytes"] += len(chunk)
+            yield chunk
+
+    def write_bytes_file(save_path, data):
+        nonlocal bytes_written
+        with conversion_stats.phase("write", len(data)):
+            save_path = sink.write_bytes(save_path, data)
+        bytes_written += len(data)
+        written_paths.append(save_path)
+        return save_path
+
+    def write_text_file(save_path, text):
+        return write_bytes_file(save_path, text.encode('utf-8'))
+
+    def write_resource(chunks, kind, filename, content_type=None, reread=None):
+        """리소스 페이로드를 기록하고, 페이지에서 참조할 경로를 반환 (reread는 DirectorySink.write_stream 참고)"""
+        if inline_limit is not None:
+            # 단일 파일 모드: inline_limit 이하면 data: URI를 반환하고, 넘으면 읽은 청크부터 이어서 기록
+            chunks = iter(chunks)
+            buffered = []
+            size = 0
+            with conversion_stats.phase("decode") as measured:
+                for chunk in chunks:
+                    buffered.append(chunk)
+                    size += len(chunk)
+                    if size > inline_limit:
+                        break
+                else:
+                    measured["bytes"] = size
+                    return data_uri(b"".join(buffered), content_type)
+            chunks = itertools.chain(buffered, chunks)
+        measured = {"decode": 0.0, "bytes": 0}
+        chunks = count_written(chunks, measured)
+        start = time.perf_counter()
         try:
-            # 상대 URL인 경우 절��� URL로 변환
-            if base_url and not urlparse(font_url).netloc:
-                font_url = urljoin(base_url, font_url)
-            
-            # 이미 다운로드된 폰트인지 확인
-            if font_url in resource_mapping:
-                print(f"Font already downloaded: {font_url}")
-                return resource_mapping[font_url]
-            
-            # 폰트 다운로드
-            response = requests.get(font_url, allow_redirects=True)
-            if response.status_code == 200:
-                # 파일명 생성
-                url_path = urlparse(font_url).path
-                filename = os.path.basename(url_path)
-                if not filename:
-                    filename = str(uuid.uuid4())[:8]
-                
-                # 파일명 정리
-                sanitized_filename = sanitize_filename(filename)
-                if not any(sanitized_filename.endswith(ext) for ext in ['.woff', '.woff2', '.ttf', '.eot', '.otf']):
-                    # Content-Type에서 확장자 추측 시도
-                    content_type = response.headers.get('Content-Type', '')
-                    if 'woff2' in content_type:
-                        sanitized_filename = f"{sanitized_filename}.woff2"
-                    elif 'woff' in content_type:
-                        sanitized_filename = f"{sanitized_filename}.woff"
-                    elif 'ttf' in content_type or 'truetype' in content_type:
-                        sanitized_filename = f"{sanitized_filename}.ttf"
-                    elif 'opentype' in content_type:
-                        sanitized_filename = f"{sanitized_filename}.otf"
-                    elif 'embedded-opentype' in content_type:
-                        sanitized_filename = f"{sanitized_filename}.eot"
-                    else:
-                        # 확장자를 추측할 수 없는 경우 woff2 사용
-                        sanitized_filename = f"{sanitized_filename}.woff2"
-                
-                # 폰트 파일 저장
-                save_path = font_dir / sanitized_filename
-                save_path.write_bytes(response.content)
-                
-                # 상대 경로로 변환
-                relative_save_path = os.path.relpath(save_path, output_dir)
-                if os.path.sep == '\\':
-                    relative_save_path = relative_save_path.replace('\\', '/')
-                
-                # 리소스 매핑에 추가
-                resource_mapping[font_url] = relative_save_path
-                print(f"Downloaded and saved font: {font_url} -> {relative_save_path}")
-                return relative_save_path
-            else:
-                print(f"Failed to download font: {font_url} (Status code: {response.status_code})")
-                return None
-        except Exception as e:
-            print(f"Error downloading font: {font_url} - {str(e)}")
-            return None
+            save_path = sink.write_stream(f"{RESOURCE_DIRS[kind]}/{filename}", chunks, shareable=True,
+                                         reread=reread)
+            written_paths.append(save_path)
+            return save_path
+        finally:
+            # 스트리밍 디코딩과 기록이 섞여 있으므로 디코딩 시간을 빼서 기록 시간을 구함
+            conversion_stats.add("decode", measured["decode"], measured["bytes"])
+            conversion_stats.add("write", time.perf_counter() - start - measured["decode"], measured["bytes"])
+
+    def save_web_font(font_url, result):
+        """내려받은 웹 폰트를 저장하고 리소스 매핑에 추가"""
+        content, content_type = result
+        # URL에 폰트 확장자가 없으면 Content-Type에서 추측
+        sanitized_filename = filenames.allocate("font", font_url, posixpath.basename(urlparse(font_url).path),
+                                                FONT_EXTENSIONS, _font_extension(content_type))
+        
+        # 폰트 파일 저장 후 리소스 매핑에 추가
+        relative_save_path = write_resource([content], "font", sanitized_filename, content_type,
+                                            reread=lambda: [content])
+        resource_mapping[font_url] = relative_save_path
+        logger.debug("Downloaded and saved font: %s -> %s", font_url, relative_save_path)
+        return relative_save_path
+
+    def download_pending_fonts():
+        """모든 CSS 파트에서 모은 폰트 URL을 한꺼번에 동시 다운로드하여 리소스 매핑에 추가
+        
+        CSS 안의 폰트 url()은 다른 url()과 함께 CSS 재작성 단계에서 매핑으로 바뀐다.
+        """
+        if not pending_font_css:
+            return
+        # 상대 URL인 경우 절대 URL로 변환
+        absolute_urls = set()
+        for base_url, font_urls in pending_font_css:
+            for font_url in font_urls:
+                try:
+                    absolute_urls.add(urljoin(base_url, font_url) if base_url else font_url)
+                except ValueError:
+                    logger.debug("Skipped malformed font URL: %s (%s)", font_url, base_url)
+        
+        # 아카이브에 들어 있거나 이미 다운로드된 폰트는 제외
+        to_fetch = [url for url in absolute_urls if url not in resource_mapping]
+        results = get_font_fetcher(font_cache_dir).fetch_all(to_fetch)
+        for url, result in results.items():
+            if result is not None:
+                save_web_font(url, result)
 
     def save_content(part):
         nonlocal html_saved
         nonlocal html_content
-        nonlocal additional_html_files  # additional_html_files를 외부 스코프에서 사용
+        nonlocal html_location
+        nonlocal html_charset
         content_type = part.get_content_type()
         content_location = part.get("Content-Location", "")
         content_id = part.get("Content-ID", "")
@@ -137,43 +1782,54 @@ def parse_mhtml_file(file_path, download_fonts=True):
         if content_id:
             content_id = content_id.strip("<>")
             
-        payload = part.get_payload(decode=True)
-        if not payload:
+        if part.is_empty():
+            return
+        # 파일명 할당 키 (위치 정보가 없는 파트는 아카이브 안의 순번)
+        part_key = content_location or (f"cid:{content_id}" if content_id else f"part:{part_count}")
+        
+        # 추출 정책에서 제외된 파트는 본문을 디코딩하지 않음 (메인 HTML 문서는 항상 추출)
+        if not (content_type == 'text/html' and not html_saved) and not policy.allows(part):
+            skipped_parts.append(original_path or content_id)
+            placeholder = policy.placeholder(content_type)
+            if placeholder:
+                if original_path:
+                    resource_mapping[original_path] = placeholder
+                if content_id:
+                    resource_mapping[content_id] = placeholder
+                    cid_mapping[content_id] = placeholder
+            logger.debug("Skipped by extraction policy: %s (%s)", original_path or content_id, content_type)
             return
             
         try:
             # HTML 메인 컨텐츠 나중에 처리하기 위해 저장
             if content_type == 'text/html':
+                with conversion_stats.phase("decode") as measured:
+                    payload = part.get_payload(decode=True)
+                    measured["bytes"] = len(payload)
+                if not payload:
+                    return
                 if not html_saved:
                     html_content = payload
+                    html_location = content_location
+                    html_charset = part.get_content_charset()
                     html_saved = True
                     return
                 else:
                     # 추가 HTML 파일들은 나중에 처리하기 위해 저장
                     filename = Path(content_location).name if content_location else ""
-                    if not filename:
-                        filename = str(uuid.uuid4())[:8] + ".html"
-                    
-                    # sanitize_filename 함수를 사용하여 파일명 정리
-                    sanitized_filename = sanitize_filename(filename)
-                    if not sanitized_filename.endswith('.html'):
-                        sanitized_filename = f"{sanitized_filename}.html"
+                    sanitized_filename = filenames.allocate("html", part_key, filename, default_ext=".html")
                     
                     # HTML 파일 경로 설정
-                    save_path = html_dir / sanitized_filename
+                    relative_save_path = f"{RESOURCE_DIRS['html']}/{sanitized_filename}"
                     
                     # 나중에 처리하기 위해 정보 저장
-                    additional_html_files.append((payload, save_path, original_path, content_id))
-                    
-                    # 리소스 매핑 저장 (파일 경로만)
-                    relative_save_path = os.path.relpath(save_path, output_dir)
-                    if os.path.sep == '\\':
-                        relative_save_path = relative_save_path.replace('\\', '/')
+                    additional_html_files.append((payload, relative_save_path, original_path, content_id,
+                                                  part.get_content_charset()))
                     
                     # 일반 경로 매핑
                     if original_path:
                         resource_mapping[original_path] = relative_save_path
-                        print(f"Mapped HTML path: {original_path} -> {relative_save_path}")
+                        logger.debug("Mapped HTML path: %s -> %s", original_path, relative_save_path)
                     
                     # Content-ID 매핑
                     if content_id:
@@ -181,98 +1837,77 @@ def parse_mhtml_file(file_path, download_fonts=True):
                         resource_mapping[cid_url] = relative_save_path
                         resource_mapping[content_id] = relative_save_path
                         cid_mapping[content_id] = relative_save_path
-                        print(f"Mapped HTML CID: {cid_url} -> {relative_save_path}")
-                        print(f"Mapped HTML CID (without prefix): {content_id} -> {relative_save_path}")
+                        logger.debug("Mapped HTML CID: %s -> %s", cid_url, relative_save_path)
                     return
             
             # 리소스 파일 처리
             filename = Path(content_location).name if content_location else ""
-            if not filename:
-                filename = str(uuid.uuid4())[:8]  # UUID를 문자열로 변환 후 슬라이싱
             
             # URL에서 파일명만 추출 (경로와 쿼리 파라미터 제거)
             filename = filename.split('/')[-1].split('?')[0]
+            relative_path = None
             
-            # 파일명 정리
-            sanitized_filename = sanitize_filename(str(filename))
-            print("[*] sanitized_filename:", sanitized_filename, filename)
-            save_path = None
-            
-            # 리소스 타입별 저장
-            if 'font' in content_type or any(filename.endswith(ext) for ext in ['.woff', '.woff2', '.ttf', '.eot', '.otf']):
-                # 폰트 파일 확장자 처리
-                if not any(sanitized_filename.endswith(ext) for ext in ['.woff', '.woff2', '.ttf', '.eot', '.otf']):
-                    ext = f".{content_type.split('/')[-1]}"
-                    if ext == '.vnd.ms-fontobject':
-                        ext = '.eot'
-                    sanitized_filename = f"{sanitized_filename}{ext}"
-                save_path = font_dir / sanitized_filename
-                save_path.write_bytes(payload)
-                print(f"Saved font file: {save_path}")
+            # 리소스 타입별 저장 (원래 확장자가 타입에 맞지 않으면 Content-Type에서 정함)
+            if 'font' in content_type or filename.lower().endswith(FONT_EXTENSIONS):
+                ext = f".{content_type.split('/')[-1]}"
+                if ext == '.vnd.ms-fontobject':
+                    ext = '.eot'
+                sanitized_filename = filenames.allocate("font", part_key, filename, FONT_EXTENSIONS, ext)
+                relative_path = write_resource(part.iter_payload(), "font", sanitized_filename, content_type,
+                                               reread=part.iter_payload)
+                logger.debug("Saved font file: %s", relative_path)
                 
             elif 'image' in content_type:
-                if not sanitized_filename.endswith(tuple(['.jpg','.jpeg','.png','.gif','.webp','.svg'])):
-                    if 'svg' in content_type:
-                        sanitized_filename = f"{sanitized_filename}.svg"
-                    elif 'gif' in content_type:
-                        sanitized_filename = f"{sanitized_filename}.gif"
-                    else:
-                        ext = f".{content_type.split('/')[-1]}"
-                        sanitized_filename = f"{sanitized_filename}{ext}"
-                save_path = image_dir / sanitized_filename
-                save_path.write_bytes(payload)
-                print(f"Saved image file: {save_path}")
+                if 'svg' in content_type:
+                    ext = '.svg'
+                elif 'gif' in content_type:
+                    ext = '.gif'
+                else:
+                    ext = f".{content_type.split('/')[-1]}"
+                sanitized_filename = filenames.allocate("image", part_key, filename, IMAGE_EXTENSIONS, ext)
+                relative_path = write_resource(part.iter_payload(), "image", sanitized_filename, content_type,
+                                               reread=part.iter_payload)
+                logger.debug("Saved image file: %s", relative_path)
                 
             elif 'css' in content_type or filename.endswith('.css'):
-                if not sanitized_filename.endswith('.css'):
-                    sanitized_filename = f"{sanitized_filename}.css"
-                save_path = css_dir / sanitized_filename
+                sanitized_filename = filenames.allocate("css", part_key, filename, default_ext=".css")
+                relative_path = f"{RESOURCE_DIRS['css']}/{sanitized_filename}"
+                with conversion_stats.phase("decode") as measured:
+                    payload = part.get_payload(decode=True)
+                    measured["bytes"] = len(payload)
                 
-                try:
-                    css_content = payload.decode('utf-8', errors='ignore')
-                    # 폰트 URL 처리 (DOWNLOAD_FONTS가 활성화된 경우)
-                    if DOWNLOAD_FONTS:
-                        font_urls = re.findall(r'url\([\'"]?([^\'"]+\.(?:woff2?|ttf|eot|otf))[\'"]?\)', css_content)
-                        for font_url in font_urls:
-                            local_path = download_web_font(font_url, content_location)
-                            if local_path:
-                                css_content = css_content.replace(font_url, local_path)
-                    
-                    # CSS 파일 임시 저장
-                    save_path.write_text(css_content, encoding='utf-8')
-                except Exception as e:
-                    print(f"Warning: Failed to process CSS content: {e}")
-                    save_path.write_bytes(payload)
+                # CSS는 폰트 경로 반영과 임베드 여부가 정해진 뒤에 기록
+                css_content = payload.decode('utf-8', errors='ignore')
+                css_texts[relative_path] = css_content
+                css_locations[relative_path] = content_location
+                # 폰트 URL 수집 (DOWNLOAD_FONTS가 활성화된 경우 모든 파트 처리 후 한꺼번에 다운로드)
+                font_urls = css_font_urls(css_content) if DOWNLOAD_FONTS or logger.isEnabledFor(logging.DEBUG) else []
+                if DOWNLOAD_FONTS:
+                    if font_urls:
+                        pending_font_css.append((content_location, font_urls))
+                elif font_urls:
+                    logger.debug("Font download skipped (disabled): %s", content_location)
                 
-                # CSS 파일에서 폰트 URL 찾기
-                try:
-                    css_content = payload.decode('utf-8', errors='ignore')
+                # CSS 파일에서 폰트 URL 찾기 (디버그 출력이 켜진 경우만)
+                if logger.isEnabledFor(logging.DEBUG):
                     # @font-face 규칙에서 src: url() 찾기
-                    font_urls = re.findall(r'url\([\'"]?([^\'"]+\.(?:woff2?|ttf|eot|otf))[\'"]?\)', css_content)
                     for font_url in font_urls:
-                        print(f"Found font reference in CSS: {font_url}")
+                        logger.debug("Found font reference in CSS: %s", font_url)
                         if font_url in resource_mapping:
-                            print(f"Font already mapped: {font_url} -> {resource_mapping[font_url]}")
-                except Exception as e:
-                    print(f"Warning: Failed to process CSS content for font detection: {e}")
+                            logger.debug("Font already mapped: %s -> %s", font_url, resource_mapping[font_url])
                 
             elif 'javascript' in content_type or content_location.endswith('.js'):
-                if not sanitized_filename.endswith('.js'):
-                    sanitized_filename = f"{sanitized_filename}.js"
-                save_path = js_dir / sanitized_filename
-                save_path.write_text(payload.decode('utf-8', errors='ignore'))
+                sanitized_filename = filenames.allocate("javascript", part_key, filename, default_ext=".js")
+                # 재작성이 필요 없으므로 디코딩된 바이트를 그대로 기록
+                relative_path = write_resource(part.iter_payload(), "javascript", sanitized_filename, content_type,
+                                               reread=part.iter_payload)
             
-            # 리소스 매핑 저장
-            if save_path:
-                # 상대 경로로 변환 (output_dir 기준)
-                relative_path = os.path.relpath(save_path, output_dir)
-                # Windows 경로를 웹 스타일 경로로 변환
-                relative_path = relative_path.replace('\\', '/')
-                
+            # 리소스 매핑 저장 (출력 루트 기준 상대 경로)
+            if relative_path:
                 # 일반 경로 매핑
                 if original_path:
                     resource_mapping[original_path] = relative_path
-                    print(f"Mapped path: {original_path} -> {relative_path}")
+                    logger.debug("Mapped path: %s -> %s", original_path, relative_path)
                 
                 # Content-ID 매핑
                 if content_id:
@@ -280,276 +1915,874 @@ def parse_mhtml_file(file_path, download_fonts=True):
                     resource_mapping[cid_url] = relative_path
                     resource_mapping[content_id] = relative_path
                     cid_mapping[content_id] = relative_path
-                    print(f"Mapped CID: {cid_url} -> {relative_path}")
-                    print(f"Mapped CID (without prefix): {content_id} -> {relative_path}")
+                    logger.debug("Mapped CID: %s -> %s", cid_url, relative_path)
                     
         except Exception as e:
-            print(f"Error processing content: {e}\n")
-            print(f"Failed content type: {content_type}")
-            print(f"Original path: {original_path}")
-            print(f"Content-ID: {content_id}")
-            exit(0)
+            logger.error("Error processing content: %s (content type: %s, original path: %s, Content-ID: %s)",
+                         e, content_type, original_path, content_id)
+            # 프로세스를 종료하지 않고 호출자(배치 드라이버)에게 실패를 전달
+            raise
 
     def process_html(payload):
         nonlocal total_replacement_count  # 전역 카운터 사용
-        # HTML 디코딩
-        detected = chardet.detect(payload)
-        try:
-            # 먼저 UTF-8로 시도
-            content = payload.decode('utf-8')
-        except UnicodeDecodeError:
-            # UTF-8 실패시 chardet로 인코딩 감지
-            detected = chardet.detect(payload)
-            try:
-                content = payload.decode(detected['encoding'] if detected['encoding'] else 'utf-8')
-            except:
-                # 다른 일반적인 인코딩들로 시도
-                for encoding in ['cp1252', 'iso-8859-1', 'cp949', 'euc-kr']:
-                    try:
-                        content = payload.decode(encoding)
-                        break
-                    except:
-                        continue
-        
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # CSS 파일을 style 태그로 임베드
-        for link in soup.find_all('link', rel='stylesheet'):
-            href = link.get('href')
-            if href and href in resource_mapping:
-                css_path = output_dir / resource_mapping[href]
-                try:
-                    if css_path.exists():
-                        # CSS 파일 내용 읽기
-                        css_content = css_path.read_text(encoding='utf-8')
-                        # style 태그 생성
-                        style_tag = soup.new_tag('style')
-                        style_tag.string = css_content
-                        # link 태그를 style 태그로 교체
-                        link.replace_with(style_tag)
-                        # CSS 파일 삭제 (선택사항)
-                        css_path.unlink()
-                        print(f"Embedded CSS file: {href}")
-                except Exception as e:
-                    print(f"Failed to embed CSS file {href}: {e}")
-        
-        # 디버깅: 매핑 정보 출력
-        print("\nResource mapping contents:")
-        print("CID Mapping:")
-        for k, v in cid_mapping.items():
-            print(f"  {k} -> {v}")
-        print("\nResource Mapping:")
-        for k, v in resource_mapping.items():
-            print(f"  {k} -> {v}")
-        print("\nStarting resource replacement...")
-        
-        # 리소스 교체 카운터 추가
-        replacement_count = 0
-        unmapped_resources = set()  # 매핑되지 않은 리소스 추적
+        # 디버깅: 매핑 정보 출력 (디버그 출력이 꺼져 있으면 순회하지 않음)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("CID Mapping:\n%s", "\n".join(f"  {k} -> {v}" for k, v in cid_mapping.items()))
+            logger.debug("Resource Mapping:\n%s", "\n".join(f"  {k} -> {v}" for k, v in resource_mapping.items()))
+        logger.debug("Starting resource replacement...")
         
-        # 리소스 경로 업데이트
-        for tag in soup.find_all(['img', 'script', 'link', 'iframe', 'frame']):
-            src_attr = 'href' if tag.name == 'link' else 'src'
-            resource_path = tag.get(src_attr)
-            
-            if not resource_path:
-                continue
-                
-            print(f"Processing {tag.name} with {src_attr}: {resource_path}")  # 디버깅용
-            
-            # cid: URL 처리
-            if resource_path.startswith('cid:'):
-                cid_without_prefix = resource_path[4:]  # cid: 제거
-                if cid_without_prefix in cid_mapping:  # cid_mapping 사용
-                    tag[src_attr] = cid_mapping[cid_without_prefix]
-                    replacement_count += 1
-                    print(f"Replaced ({replacement_count}) {resource_path} -> {cid_mapping[cid_without_prefix]}")
-                elif cid_without_prefix in resource_mapping:
-                    tag[src_attr] = resource_mapping[cid_without_prefix]
-                    replacement_count += 1
-                    print(f"Replaced ({replacement_count}) {resource_path} -> {resource_mapping[cid_without_prefix]}")
-                elif resource_path in resource_mapping:
-                    tag[src_attr] = resource_mapping[resource_path]
-                    replacement_count += 1
-                    print(f"Replaced ({replacement_count}) {resource_path} -> {resource_mapping[resource_path]}")
-                else:
-                    unmapped_resources.add(f"{tag.name}[{src_attr}]: {resource_path}")
-            # 일반 경로 처리
-            elif resource_path in resource_mapping:
-                tag[src_attr] = resource_mapping[resource_path]
-                replacement_count += 1
-                print(f"Replaced ({replacement_count}) {resource_path} -> {resource_mapping[resource_path]}")
-            elif not resource_path.startswith(('http://', 'https://', 'data:', '/')):
-                # 외부 URL이나 절대 경로가 아닌 경우만 추적
-                unmapped_resources.add(f"{tag.name}[{src_attr}]: {resource_path}")
-        
-        # 인라인 스타일의 url() 처리
-        for tag in soup.find_all(style=True):
-            style = tag['style']
-            # cid: URL을 포함한 모든 URL 패턴 찾기
-            urls = re.findall(r'url\([\'"]?(cid:[^\'"]+|[^\'"]+)[\'"]?\)', style)
-            for url in urls:
-                replaced = False
-                if url.startswith('cid:'):
-                    cid_without_prefix = url[4:]
-                    if cid_without_prefix in cid_mapping:  # 먼저 cid_mapping 확인
-                        new_url = cid_mapping[cid_without_prefix]
-                        style = style.replace(url, new_url)
-                        replacement_count += 1
-                        replaced = True
-                        print(f"Replaced ({replacement_count}) style URL {url} -> {new_url}")
-                    elif cid_without_prefix in resource_mapping:
-                        new_url = resource_mapping[cid_without_prefix]
-                        style = style.replace(url, new_url)
-                        replacement_count += 1
-                        replaced = True
-                        print(f"Replaced ({replacement_count}) style URL {url} -> {new_url}")
-                    elif url in resource_mapping:
-                        new_url = resource_mapping[url]
-                        style = style.replace(url, new_url)
-                        replacement_count += 1
-                        replaced = True
-                        print(f"Replaced ({replacement_count}) style URL {url} -> {new_url}")
-                elif url in resource_mapping:
-                    new_url = resource_mapping[url]
-                    style = style.replace(url, new_url)
-                    replacement_count += 1
-                    replaced = True
-                    print(f"Replaced ({replacement_count}) style URL {url} -> {new_url}")
-                
-                if not replaced and not url.startswith(('http://', 'https://', 'data:', '/')):
-                    unmapped_resources.add(f"style[url()]: {url}")
-            tag['style'] = style
+        # HTML 디코딩 후 CSS 파일을 style 태그로 임베드하면서 리소스 경로 업데이트
+        processed, rewriter = rewrite_html_part(payload, resource_index, html_location, html_charset, rewrite_engine,
+                                                inline_stylesheet=inline_stylesheet,
+                                                charset_detector=charset_detector, stats=conversion_stats,
+                                                embed=embed_stylesheet)
         
         # 변환된 HTML 출력 (디버깅용)
-        print("\nProcessed HTML preview:")
-        for tag in soup.find_all(['link', 'script', 'img', 'iframe', 'frame']):
-            print(f"{tag.name}: {tag.get('href') or tag.get('src')}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processed HTML preview:\n%s",
+                         "\n".join(f"{tag_name}: {value}" for tag_name, value in rewriter.preview))
         
-        print(f"\nResource replacements in this file: {replacement_count}")
-        total_replacement_count += replacement_count  # 전체 카운터에 추가
+        logger.debug("Resource replacements in this file: %d", rewriter.replacement_count)
+        total_replacement_count += rewriter.replacement_count  # 전체 카운터에 추가
+        unmapped_resources.update(rewriter.unmapped)
         
         # 매핑되지 않은 리소스 보고
-        if unmapped_resources:
-            print("\nUnmapped Resources Report:")
-            print("The following resources could not be mapped to local files:")
-            for resource in sorted(unmapped_resources):
-                print(f"  - {resource}")
+        if rewriter.unmapped and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("The following resources could not be mapped to local files:\n%s",
+                         "\n".join(f"  - {resource}" for resource in sorted(rewriter.unmapped)))
         
-        # 수정된 HTML 저장 (MHTML 파일 위치에)
-        save_path = output_dir / output_html_name
-        save_path.write_text(str(soup), encoding='utf-8')
-        return content
-
-    # MHTML 파싱
-    with open(mhtml_path, 'r', encoding='utf-8') as f:
-        email_parser = parser.Parser()
-        mhtml = email_parser.parse(f)
+        # 수정된 HTML 저장
+        write_text_file(output_name, processed)
+
+    def rewrite_stylesheet(css_path, document_dir, count=True):
+        """CSS 파트의 url()과 @import를 스타일시트 자신의 위치 기준으로 해석하여 재작성
+        
+        count가 False면 교체/미매핑 현황을 집계하지 않고 (CSS, ResourceRewriter)를 반환한다.
+        """
+        nonlocal total_replacement_count
+        css_content = css_texts[css_path]
+        rewriter = ResourceRewriter(resource_index, css_locations.get(css_path) or html_location,
+                                    conversion_stats, document_dir, embed_stylesheet)
+        with conversion_stats.phase("css", len(css_content)):
+            css_content = rewriter.rewrite_style(css_content, "css")
+        if not count:
+            return css_content, rewriter
+        total_replacement_count += rewriter.replacement_count
+        unmapped_resources.update(rewriter.unmapped)
+        return css_content
+    
+    def stylesheet_uri(css_path):
+        """단일 파일 모드: 스타일시트를 출력 루트 기준으로 재작성한 data:text/css URI를 반환
         
+        크기가 inline_limit을 넘거나 파일로 남은 리소스를 상대 경로로 참조하면 None을 반환한다.
+        """
+        nonlocal total_replacement_count
+        if css_path not in css_texts:
+            return None
+        if css_path in css_uris:
+            return css_uris[css_path]
+        css_uris[css_path] = None  # 순환 @import 방지
+        css_content, rewriter = rewrite_stylesheet(css_path, "", count=False)
+        data = css_content.encode('utf-8')
+        if len(data) > inline_limit or any(
+                not (url.startswith(('data:', '/', '#')) or getattr(_split_css_url(url), 'scheme', ''))
+                for url, _ in iter_css_urls(css_content)):
+            return None
+        total_replacement_count += rewriter.replacement_count
+        unmapped_resources.update(rewriter.unmapped)
+        css_uris[css_path] = data_uri(data, "text/css")
+        embedded_css.add(css_path)
+        logger.debug("Embedded CSS file as data: URI: %s", css_path)
+        return css_uris[css_path]
+    
+    # 단일 파일 모드에서 스타일시트 참조(@import 등)를 data: URI로 바꾸는 함수
+    embed_stylesheet = stylesheet_uri if inline_limit is not None else None
+
+    def inline_stylesheet(href):
+        """CSS 내용을 반환하고 별도 파일로는 기록하지 않음 (임베드되지 않으면 None)"""
+        if href in inlined_css:
+            return inlined_css[href]
+        css_relative_path = resource_index.resolve(href, html_location)
+        if css_relative_path is None or css_relative_path not in css_texts:
+            return None
+        # 메인 HTML에 들어가므로 출력 루트 기준 경로로 재작성
+        css_content = rewrite_stylesheet(css_relative_path, "")
+        embedded_css.add(css_relative_path)
+        inlined_css[href] = css_content
+        logger.debug("Embedded CSS file: %s", href)
+        return css_content
+
+    # MHTML 파싱 (mmap 또는 메모리 버퍼에서 파트를 스트리밍)
     # 먼저 모든 리소스를 처리하고 매핑 생성
-    if mhtml.is_multipart():
-        for part in mhtml.walk():
-            save_content(part)
-    else:
-        save_content(mhtml)
+    with conversion_stats.phase("parts"), open_mhtml_buffer(source) as buffer:
+        parts = iter_mhtml_parts(buffer)
+        while True:
+            # 경계 검색과 헤더 파싱 시간
+            start = time.perf_counter()
+            part = next(parts, None)
+            conversion_stats.add("mime", time.perf_counter() - start)
+            if part is None:
+                break
+            part_count += 1
+            written_before = bytes_written
+            start = time.perf_counter()
+            with conversion_stats.measure_peak() as memory:
+                save_content(part)
+            conversion_stats.add_content_type(part.get_content_type(), bytes_written - written_before,
+                                              time.perf_counter() - start, memory["peak_memory"])
+    
+    # CSS에서 모은 웹 폰트를 동시에 다운로드
+    if pending_font_css:
+        with conversion_stats.phase("fonts"):
+            download_pending_fonts()
+    
+    # 모든 재작성 위치(HTML, 프레임, 스타일시트)에서 공유하는 URL 조회 인덱스 (아카이브당 한 번 생성)
+    resource_index = ResourceIndex(resource_mapping, cid_mapping)
     
     # 모든 리소스가 처리된 후 HTML 처리
     if html_saved and html_content:
-        print("Processing main HTML content...")
-        process_html(html_content)
-        print("Processing main HTML completed.")
+        logger.debug("Processing main HTML content...")
+        with conversion_stats.phase("html", len(html_content)):
+            process_html(html_content)
         
-        # 추가 HTML 파일들 처리
-        print("\nProcessing additional HTML files...")
-        for payload, save_path, original_path, content_id in additional_html_files:
-            try:
-                content = payload.decode('utf-8', errors='ignore')
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # 이 파일의 리소스 교체 카운터
-                file_replacement_count = 0
-                
-                # 리소스 경로 업데이트
-                for tag in soup.find_all(['img', 'script', 'link', 'iframe', 'frame']):
-                    src_attr = 'href' if tag.name == 'link' else 'src'
-                    resource_path = tag.get(src_attr)
-                    
-                    if not resource_path:
-                        continue
-                    
-                    if resource_path.startswith('cid:'):
-                        cid_without_prefix = resource_path[4:]
-                        if cid_without_prefix in cid_mapping:
-                            tag[src_attr] = cid_mapping[cid_without_prefix]
-                            file_replacement_count += 1
-                        elif cid_without_prefix in resource_mapping:
-                            tag[src_attr] = resource_mapping[cid_without_prefix]
-                            file_replacement_count += 1
-                        elif resource_path in resource_mapping:
-                            tag[src_attr] = resource_mapping[resource_path]
-                            file_replacement_count += 1
-                    elif resource_path in resource_mapping:
-                        tag[src_attr] = resource_mapping[resource_path]
-                        file_replacement_count += 1
-                
-                # 인라인 스타일의 url() 처리
-                for tag in soup.find_all(style=True):
-                    style = tag['style']
-                    urls = re.findall(r'url\([\'"]?(cid:[^\'"]+|[^\'"]+)[\'"]?\)', style)
-                    for url in urls:
-                        if url.startswith('cid:'):
-                            cid_without_prefix = url[4:]
-                            if cid_without_prefix in cid_mapping:
-                                style = style.replace(url, cid_mapping[cid_without_prefix])
-                                file_replacement_count += 1
-                            elif cid_without_prefix in resource_mapping:
-                                style = style.replace(url, resource_mapping[cid_without_prefix])
-                                file_replacement_count += 1
-                            elif url in resource_mapping:
-                                style = style.replace(url, resource_mapping[url])
-                                file_replacement_count += 1
-                        elif url in resource_mapping:
-                            style = style.replace(url, resource_mapping[url])
-                            file_replacement_count += 1
-                    tag['style'] = style
-                
+        # 추가 HTML 파일들 처리 (메인 문서 처리 후의 인덱스 / 인코딩 스냅샷으로 재작성, 결과는 파트 순서대로 기록)
+        logger.debug("Processing additional HTML files...")
+        frames_start = time.perf_counter()
+        jobs = [(payload, save_path, original_path, charset)
+                for payload, save_path, original_path, _, charset in additional_html_files]
+        context = (resource_index, rewrite_engine, charset_detector.archive_encoding)
+        if frame_workers > 1 and len(jobs) > 1 and frame_executor == "process":
+            executor = ProcessPoolExecutor(min(frame_workers, len(jobs)), initializer=_init_frame_worker,
+                                           initargs=context)
+            rewrite_frame = _rewrite_frame
+        elif frame_workers > 1 and len(jobs) > 1:
+            executor = ThreadPoolExecutor(min(frame_workers, len(jobs)))
+            rewrite_frame = functools.partial(_rewrite_frame, context=context)
+        else:
+            executor = None
+            rewrite_frame = functools.partial(_rewrite_frame, context=context)
+        with executor or contextlib.nullcontext():
+            results = executor.map(rewrite_frame, jobs) if executor else map(rewrite_frame, jobs)
+            for (payload, save_path, _, _), (processed, file_replacement_count, unmapped, phases, error) in zip(jobs, results):
+                conversion_stats.merge(phases)
+                if error:
+                    logger.warning("Failed to process HTML content %s: %s", save_path, error)
+                    # 실패하면 원본 그대로 저장
+                    write_bytes_file(save_path, payload)
+                    logger.debug("Saved original HTML content: %s", save_path)
+                    continue
                 # 수정된 HTML 저장
-                save_path.write_text(str(soup), encoding='utf-8')
-                print(f"Processed and saved HTML file: {save_path}")
-                print(f"Resource replacements in this file: {file_replacement_count}")
+                write_text_file(save_path, processed)
+                logger.debug("Processed and saved HTML file: %s (replacements: %d)", save_path, file_replacement_count)
                 total_replacement_count += file_replacement_count  # 전체 카운터에 추가
-            except Exception as e:
-                print(f"Warning: Failed to process HTML content: {e}")
-                # 실패하면 원본 그대로 저장
-                save_path.write_bytes(payload)
-                print(f"Saved original HTML content: {save_path}")
-        print("Processing additional HTML files completed.")
-        
-        # 모든 처리가 끝난 후 총 교체 수 출력
-        print(f"\nTotal number of resource replacements across all HTML files: {total_replacement_count}")
+                unmapped_resources.update(unmapped)
+        if additional_html_files:
+            conversion_stats.add("frames", time.perf_counter() - frames_start,
+                                 sum(len(payload) for payload, *_ in additional_html_files))
     else:
-        print("No HTML content found or processing failed.")
-        print(html_saved, html_content is None)
+        logger.warning("No HTML content found in %s", source_name)
+    
+    # 메인 HTML에 임베드되지 않은 CSS를 재작성하여 기록 (CSS 파일 위치 기준 상대 경로)
+    # 임베드된 CSS라도 파일로 기록되는 스타일시트가 경로로 @import하면 함께 기록
+    pending_css = [css_path for css_path in css_texts if css_path not in embedded_css]
+    written_css = set(pending_css)
+    for css_path in pending_css:  # 순회 중에 뒤에 추가된 스타일시트까지 기록
+        write_text_file(css_path, rewrite_stylesheet(css_path, posixpath.dirname(css_path)))
+        for url, _ in iter_css_urls(css_texts[css_path]):
+            imported = resource_index.resolve(url, css_locations.get(css_path) or html_location)
+            if imported in css_texts and imported not in written_css and css_uris.get(imported) is None:
+                written_css.add(imported)
+                pending_css.append(imported)
+    
+    # 변환 결과 요약 반환
+    stats = {
+        "parts": part_count,
+        "resources": len(set(resource_mapping.values())),
+        "html_files": (1 if html_saved and html_content else 0) + len(additional_html_files),
+        "replacements": total_replacement_count,
+        "unmapped": len(unmapped_resources),
+        "skipped_parts": len(skipped_parts),
+        "bytes_written": bytes_written,
+        "timings": conversion_stats.timings(),
+    }
+    if profile:
+        stats["profile"] = conversion_stats.as_dict()
+    # 파일별 요약 이벤트 (JSON 한 줄)
+    if summary_logger.isEnabledFor(logging.INFO):
+        summary_logger.info(json.dumps(dict(stats, event="conversion", path=source_name), ensure_ascii=False))
+    
+    frame_paths = [save_path for _, save_path, *_ in additional_html_files] if html_saved and html_content else []
+    return {
+        "html": output_name if html_saved and html_content else None,
+        "frames": frame_paths,
+        "resources": [path for path in written_paths if path != output_name and path not in frame_paths],
+        "mapping": {
+            "resources": resource_mapping,
+            "cids": cid_mapping,
+            "unmapped": sorted(unmapped_resources),
+            "skipped": skipped_parts,
+        },
+        "stats": stats,
+    }
 
-# 사용 예시
-if __name__ == "__main__":
-    base_dir = Path(r"./data/survey/raw-survey-data")
+def convert_mhtml_to_memory(source, output_name="index.html", **options):
+    """MHTML을 디스크에 쓰지 않고 변환하여 결과를 bytes로 반환
     
-    # 모든 original.mhtml 파일 찾기
-    mhtml_files = list(base_dir.rglob("original.mhtml"))
+    반환값은 convert_mhtml과 같은 구조이되 "html"은 메인 HTML 바이트(없으면 None),
+    "frames"와 "resources"는 {경로: bytes} dict다. 옵션은 convert_mhtml과 같다.
+    """
+    sink = MemorySink()
+    result = convert_mhtml(source, sink, output_name=output_name, **options)
+    return dict(
+        result,
+        html=sink.files.get(result["html"]) if result["html"] else None,
+        frames={path: sink.files[path] for path in result["frames"]},
+        resources={path: sink.files[path] for path in result["resources"]},
+    )
+
+def parse_mhtml_file(file_path, download_fonts=True, store_dir=None, store_link="hardlink",
+                     rewrite_engine="stream", font_cache_dir=None, incremental=False,
+                     profile=False, profile_hook=None, archive_format=None, inline_limit=None,
+                     frame_workers=1, frame_executor="thread", policy=None, readable_names=False,
+                     precompress=False, precompress_min_size=PRECOMPRESS_MIN_SIZE):
+    """MHTML 파일을 같은 디렉토리의 <stem>.html과 resource/ 트리로 변환
+    
+    store_dir를 지정하면 이미지/폰트/스크립트를 내용 해시 이름으로 공유 저장소에 한 번만 기록한다.
+    store_link가 "hardlink"면 resource/ 아래에 하드링크를 만들고, "relative"면 페이지에서
+    저장소 파일을 상대 경로로 직접 참조한다.
+    rewrite_engine은 HTML 리소스 경로 재작성 방식 ("stream" 또는 "soup", rewrite_html 참고).
+    font_cache_dir를 지정하면 내려받은 웹 폰트를 실행 간에 공유하는 디스크 캐시에 보관한다.
+    incremental이 True면 매니페스트(<stem>.manifest.json)가 입력/옵션/변환기 버전과 일치할 때
+    변환을 건너뛰고 기록된 통계에 "skipped": True를 붙여 반환한다.
+    profile이 True면 반환 통계의 "profile"에 단계별 / 콘텐츠 타입별 시간, 바이트, 최대 메모리
+    (tracemalloc)를 담는다 (ConversionStats 참고). profile_hook(단계 이름, 누적 기록)은 계측할 때마다 호출된다.
+    archive_format("zip", "tar", "tar.gz" 등)을 지정하면 디렉토리 트리 대신 같은 내용을
+    <stem>.<확장자> 아카이브 하나에 순차적으로 기록한다 (store_dir와 함께 쓸 수 없음).
+    inline_limit을 지정하면 단일 파일 모드로 변환한다 (convert_mhtml 참고).
+    frame_workers, frame_executor는 프레임 병렬 재작성 설정이다 (convert_mhtml 참고).
+    policy(ExtractionPolicy)를 지정하면 제외된 파트를 디코딩/기록하지 않는다.
+    readable_names가 True면 리소스 파일명에 원래 파일명을 남긴다 (FilenameAllocator 참고).
+    precompress가 True면 precompress_min_size 이상인 HTML/CSS/JS 등의 출력 옆에 .gz (brotli가 있으면 .br)
+    사본을 변환과 병렬로 만들고, 통계의 "precompressed"에 만든 사본 수를 기록한다 (DirectorySink 참고).
+    변환 자체는 convert_mhtml에 DirectorySink 또는 아카이브 싱크를 넘겨 수행한다.
+    """
+    # MHTML 파일 경로 처리
+    mhtml_path = Path(file_path)
+    output_html_name = f"{mhtml_path.stem}.html"  # .mhtml을 .html로 변경
+    
+    # 출력 결과에 영향을 주는 옵션 (매니페스트에 기록)
+    manifest_options = {
+        "download_fonts": download_fonts,
+        "store_dir": str(store_dir) if store_dir else None,
+        "store_link": store_link if store_dir else None,
+        "rewrite_engine": rewrite_engine,
+        "archive_format": archive_format,
+        "inline_limit": inline_limit,
+        "policy": policy.as_dict() if policy else None,
+        "readable_names": readable_names,
+        "precompress": precompress_min_size if precompress else None,
+    }
+    if archive_format and store_dir:
+        raise ValueError("store_dir cannot be combined with archive output")
+    if archive_format and precompress:
+        raise ValueError("precompress cannot be combined with archive output")
+    if incremental:
+        manifest = is_conversion_current(mhtml_path, manifest_options)
+        if manifest:
+            logger.info("Skipping up-to-date conversion: %s", mhtml_path)
+            return dict(manifest.get("stats") or {}, skipped=True)
+    # 변환 도중 중단되면 최신으로 취급되지 않도록 기존 매니페스트 제거
+    manifest_path(mhtml_path).unlink(missing_ok=True)
     
-    print(f"Found {len(mhtml_files)} original.mhtml files")
+    # MHTML 파일이 있는 디렉토리에 기록
+    output_name = output_html_name
+    if archive_format:
+        # 중간에 실패한 아카이브가 남지 않도록 임시 이름으로 쓴 뒤 교체
+        output_name = f"{mhtml_path.stem}{ARCHIVE_FORMATS[archive_format]}"
+        archive_path = mhtml_path.parent / output_name
+        tmp_path = archive_path.with_name(f"{output_name}.{uuid.uuid4().hex}.tmp")
+        sink = open_archive_sink(tmp_path, archive_format)
+    else:
+        sink = DirectorySink(mhtml_path.parent, store_dir=store_dir, store_link=store_link, precompress=precompress,
+                             precompress_min_size=precompress_min_size)
+    try:
+        with contextlib.closing(sink):
+            result = convert_mhtml(mhtml_path, sink, output_name=output_html_name, download_fonts=download_fonts,
+                                   rewrite_engine=rewrite_engine, font_cache_dir=font_cache_dir, profile=profile,
+                                   profile_hook=profile_hook, source_name=str(mhtml_path),
+                                   inline_limit=inline_limit, frame_workers=frame_workers,
+                                   frame_executor=frame_executor, policy=policy, readable_names=readable_names)
+    except BaseException:
+        if archive_format:
+            tmp_path.unlink(missing_ok=True)
+        raise
+    if archive_format:
+        os.replace(tmp_path, archive_path)
+    if precompress:
+        result["stats"]["precompressed"] = len(sink.precompressed)
+    if result["html"]:
+        write_manifest(mhtml_path, manifest_options, result["stats"], output_name, digest=incremental)
+    return result["stats"]
 
-    # 각 파일 처리
-    for i, mhtml_file in enumerate(mhtml_files):
+def configure_logging(level=logging.INFO, summary_log=None):
+    """CLI/워커 프로세스용 로그 설정 (summary_log를 주면 요약 이벤트를 JSON Lines로 추가 기록)"""
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    for handler in list(summary_logger.handlers):
+        summary_logger.removeHandler(handler)
+        handler.close()
+    if summary_log:
+        handler = logging.FileHandler(summary_log, encoding='utf-8')
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        summary_logger.addHandler(handler)
+        summary_logger.setLevel(logging.INFO)
+
+def _convert_one(mhtml_file, options, spool_dir=None):
+    """파일 하나를 변환하고 결과 레코드를 반환 (예외는 레코드에 기록)
+    
+    spool_dir를 지정하면 입력 옆 대신 spool_dir 아래의 압축하지 않은 tar 파일 하나로 변환하고
+    그 경로를 레코드의 "spool"로 돌려준다 (호출자가 공유 아카이브로 옮김, append_spool 참고).
+    """
+    record = {"path": str(mhtml_file), "ok": False, "error": None, "elapsed": 0.0, "stats": None}
+    start = time.perf_counter()
+    spool_path = None
+    try:
+        if spool_dir is not None:
+            mhtml_path = Path(mhtml_file)
+            spool_path = Path(spool_dir) / f"{uuid.uuid4().hex}.tar"
+            with contextlib.closing(TarSink(spool_path)) as sink:
+                result = convert_mhtml(mhtml_path, sink, output_name=f"{mhtml_path.stem}.html",
+                                       source_name=str(mhtml_path), **options)
+            record["stats"] = result["stats"]
+            record["spool"] = str(spool_path)
+        else:
+            record["stats"] = parse_mhtml_file(mhtml_file, **options)
+        record["ok"] = True
+    except (Exception, SystemExit) as e:
+        # SystemExit도 포함해 개별 파일 실패가 전체 배치를 중단시키지 않도록 처리 (KeyboardInterrupt는 전달)
+        record["error"] = f"{type(e).__name__}: {e}"
+        if spool_path is not None:
+            spool_path.unlink(missing_ok=True)
+    record["elapsed"] = time.perf_counter() - start
+    return record
+
+def append_spool(sink, spool_path, prefix=""):
+    """_convert_one이 만든 tar 스풀의 멤버를 경로 앞에 prefix를 붙여 sink에 청크 단위로 옮기고 스풀을 지움"""
+    try:
+        with tarfile.open(spool_path, "r|") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                f = tar.extractfile(member)
+                sink.write_stream(prefix + member.name, iter(lambda: f.read(CHUNK_SIZE), b""))
+    finally:
+        os.unlink(spool_path)
+
+def convert_many(paths, workers=None, max_in_flight=None, download_fonts=False, log_config=None,
+                 spool_dir=None, **options):
+    """여러 MHTML 파일을 프로세스 풀로 변환하고, 완료되는 순서대로 결과 레코드를 yield
+    
+    workers가 1이면 현재 프로세스에서 순차 처리한다.
+    max_in_flight는 동시에 제출된 작업 수의 상한 (기본값: workers * 2).
+    log_config는 워커 프로세스에서 configure_logging에 전달할 (level, summary_log) 튜플.
+    spool_dir를 지정하면 워커가 파일마다 그 아래에 tar 스풀을 쓰고, 호출자가 레코드의 "spool"을 받아
+    한 곳(공유 아카이브 등)에 옮긴다. 워커의 출력이 메모리에 쌓이거나 피클로 넘어오지 않는다.
+    나머지 키워드 인자(store_dir 등)는 parse_mhtml_file (spool_dir가 있으면 convert_mhtml)에 그대로 전달된다.
+    """
+    options = dict(options, download_fonts=download_fonts)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for path in paths:
+            yield _convert_one(path, options, spool_dir)
+        return
+    
+    max_in_flight = max_in_flight or workers * 2
+    paths = iter(paths)
+    pool_options = {"initializer": configure_logging, "initargs": tuple(log_config)} if log_config else {}
+    executor = ProcessPoolExecutor(max_workers=workers, **pool_options)
+    try:
+        pending = {}  # future -> 입력 경로
+        while True:
+            # 진행 중인 작업 수를 max_in_flight 이하로 유지
+            for path in paths:
+                pending[executor.submit(_convert_one, path, options, spool_dir)] = path
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                record, broken_pool = _future_record(future, pending.pop(future))
+                broken = broken or broken_pool
+                yield record
+            if broken:
+                # 워커가 비정상 종료되면 (메모리 부족, segfault 등) 풀의 나머지 작업도 모두 실패하므로
+                # 진행 중이던 파일을 실패로 기록하고 새 풀로 남은 파일을 계속 처리
+                wait(pending)
+                for future, path in pending.items():
+                    yield _future_record(future, path)[0]
+                pending.clear()
+                executor.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=workers, **pool_options)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def _future_record(future, path):
+    """완료된 convert_many 작업의 (결과 레코드, 풀이 깨졌는지)를 반환"""
+    try:
+        return future.result(), False
+    except BrokenProcessPool as e:
+        record = {"path": str(path), "ok": False, "error": f"{type(e).__name__}: {e}", "elapsed": 0.0, "stats": None}
+        return record, True
+
+# 서버 모드 응답 형식 -> Content-Type
+SERVICE_FORMATS = {
+    "zip": "application/zip",
+    "tar": "application/x-tar",
+    "tar.gz": "application/gzip",
+    "html": "text/html; charset=utf-8",
+}
+
+class ServiceBusy(Exception):
+    """변환 서비스의 대기열이 가득 차서 작업을 받을 수 없음"""
+
+class JobDeadlineExceeded(BaseException):
+    """워커 안에서 작업 제한 시간이 지남
+    
+    재작성 엔진 폴백이나 프레임 원본 저장처럼 Exception을 잡고 계속 진행하는 처리에 걸려 제한 시간 뒤에도
+    작업이 이어지지 않도록 BaseException을 상속한다. _job_deadline을 벗어나면 TimeoutError로 바뀐다.
+    """
+
+@contextlib.contextmanager
+def _job_deadline(timeout):
+    """워커 프로세스 안에서 timeout초가 지나면 작업을 중단하고 TimeoutError를 일으킴 (SIGALRM을 지원하는 플랫폼만)"""
+    if not timeout or not hasattr(signal, "setitimer"):
+        yield
+        return
+    def expire(signum, frame):
+        raise JobDeadlineExceeded(f"Conversion exceeded {timeout}s")
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    except JobDeadlineExceeded as e:
+        raise TimeoutError(str(e)) from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _warm_worker():
+    """워커 프로세스를 미리 띄우기 위한 빈 작업"""
+    return os.getpid()
+
+def _service_convert_bytes(data, output_format, options, timeout):
+    """업로드된 MHTML을 메모리에서 변환하여 (응답 본문, Content-Type, 통계)를 반환 (워커에서 실행)"""
+    with _job_deadline(timeout):
+        if output_format == "html":
+            # HTML 파일 하나만 돌려주므로 크기 제한 없이 모든 리소스를 임베드하는 단일 파일 모드로 변환
+            result = convert_mhtml_to_memory(data, **dict(options, inline_limit=sys.maxsize))
+            if result["html"] is None:
+                raise ValueError("No HTML content found")
+            if result["frames"] or result["resources"]:
+                # 프레임이나 임베드할 수 없는 스타일시트는 응답에 없는 파일을 참조하게 되므로 거부
+                raise ValueError(f"Archive has {len(result['frames'])} frame(s) and {len(result['resources'])} "
+                                 "resource(s) that cannot be embedded in a single HTML file; use format=zip")
+            return result["html"], SERVICE_FORMATS[output_format], result["stats"]
+        buffer = io.BytesIO()
+        sink = open_archive_sink(buffer, output_format)
+        with contextlib.closing(sink):
+            result = convert_mhtml(data, sink, **options)
+        if result["html"] is None:
+            raise ValueError("No HTML content found")
+        return buffer.getvalue(), SERVICE_FORMATS[output_format], result["stats"]
+
+def _service_convert_path(path, options, timeout):
+    """서버 쪽 MHTML 파일을 제자리 변환하고 통계를 반환 (워커에서 실행)"""
+    with _job_deadline(timeout):
+        return parse_mhtml_file(path, **options)
+
+class ConversionService:
+    """웜 워커 프로세스 풀로 변환 작업을 처리하는 장기 실행 서비스
+    
+    워커는 시작할 때 미리 띄워 두고 작업마다 재사용하므로 모듈 import와 프로세스 생성 비용을 한 번만 낸다.
+    동시에 받는 작업은 workers + queue_size개로 제한하고, 넘치면 기다리지 않고 ServiceBusy를 일으킨다.
+    job_timeout(초)이 지나면 워커 안에서 작업을 중단하고 TimeoutError를 일으킨다 (JobDeadlineExceeded 참고).
+    워커가 중단되지 않아 (C 코드에서 멈춤 등) timeout_grace초를 더 기다려도 끝나지 않으면 풀의 워커를 종료하고
+    새 풀을 띄운 뒤 호출자에게 TimeoutError를 돌려준다. 같은 풀에서 실행 중이던 다른 작업은 실패한다.
+    root를 지정하면 그 아래의 서버 쪽 파일 경로로도 작업을 받는다.
+    나머지 키워드 인자(download_fonts, rewrite_engine, policy 등)는 모든 변환에 전달된다.
+    """
+    
+    timeout_grace = 5  # 워커 쪽 제한 시간이 먼저 걸리도록 두는 여유 (초)
+    
+    def __init__(self, workers=None, queue_size=None, job_timeout=300, root=None, log_config=None, **options):
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + (queue_size if queue_size is not None else self.workers * 2)
+        self.job_timeout = job_timeout
+        self.root = Path(root).resolve() if root else None
+        self.options = dict({"download_fonts": False}, **options)
+        self._pool_options = {"initializer": configure_logging, "initargs": tuple(log_config)} if log_config else {}
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {
+            "submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0,
+            "in_flight": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0,
+        }
+        self.executor = self._start_pool()
+    
+    def _start_pool(self):
+        executor = ProcessPoolExecutor(max_workers=self.workers, **self._pool_options)
+        # 첫 요청에서 프로세스 생성 비용을 치르지 않도록 워커를 미리 띄움
+        wait([executor.submit(_warm_worker) for _ in range(self.workers)])
+        return executor
+    
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self.counters[name] += delta
+    
+    def run(self, fn, *args, nbytes=0):
+        """fn(*args, options, job_timeout)을 워커에서 실행하고 결과를 반환"""
+        if not self._slots.acquire(blocking=False):
+            self._count(rejected=1)
+            raise ServiceBusy(f"Queue is full ({self.capacity} jobs)")
+        self._count(submitted=1, in_flight=1, bytes_in=nbytes)
+        start = time.perf_counter()
+        future = None
         try:
-            print(f"\nProcessing file {i}/{len(mhtml_files)}: {mhtml_file}")
-            parse_mhtml_file(mhtml_file, download_fonts=False)
-            print(f"Successfully processed: {mhtml_file}")
+            executor = self.executor
+            future = executor.submit(fn, *args, self.options, self.job_timeout)
+            try:
+                result = future.result(timeout=self.job_timeout + self.timeout_grace if self.job_timeout else None)
+            except TimeoutError:
+                self._count(timed_out=1)
+                if not future.done():
+                    # 제한 시간 신호로도 멈추지 않은 워커: 워커를 종료해 작업 자리와 프로세스를 되찾음
+                    self._restart_pool(executor, terminate=True)
+                raise
+            except BrokenProcessPool:
+                # 워커가 비정상 종료되면 (메모리 부족 등) 풀을 새로 만들어 이후 작업을 계속 받음
+                self._count(failed=1)
+                self._restart_pool(executor)
+                raise
+            except Exception:
+                self._count(failed=1)
+                raise
+            self._count(completed=1, seconds=time.perf_counter() - start)
+            return result
+        finally:
+            if future is None or future.done() or future.cancel():
+                self._release()
+            else:
+                # 종료된 워커의 작업은 풀이 실패로 끝낼 때까지 자리를 차지함
+                future.add_done_callback(lambda _: self._release())
+    
+    def _restart_pool(self, executor, terminate=False):
+        """executor가 아직 현재 풀이면 새 풀로 바꾸고 이전 풀을 정리 (terminate면 워커 프로세스를 종료)"""
+        with self._lock:
+            if self.executor is executor:
+                self.executor = self._start_pool()
+        if terminate:
+            # ProcessPoolExecutor에는 워커 종료 API가 없으므로 (3.14 이전) 프로세스를 직접 종료
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _release(self):
+        self._count(in_flight=-1)
+        self._slots.release()
+    
+    def convert_bytes(self, data, output_format="zip"):
+        """업로드된 MHTML을 변환하여 (응답 본문, Content-Type, 통계)를 반환"""
+        if output_format not in SERVICE_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        body, content_type, stats = self.run(_service_convert_bytes, data, output_format, nbytes=len(data))
+        self._count(bytes_out=len(body))
+        return body, content_type, stats
+    
+    def convert_path(self, path):
+        """root 아래의 MHTML 파일을 제자리 변환하고 통계를 반환"""
+        if self.root is None:
+            raise PermissionError("Path jobs are disabled (no root directory)")
+        mhtml_path = (self.root / path).resolve()
+        if not mhtml_path.is_relative_to(self.root) or not mhtml_path.is_file():
+            raise FileNotFoundError(f"Not an MHTML file under the service root: {path}")
+        return self.run(_service_convert_path, str(mhtml_path), nbytes=mhtml_path.stat().st_size)
+    
+    def metrics(self):
+        """누적 카운터와 처리량 (files/sec, MB/sec, 평균 지연 시간)"""
+        with self._lock:
+            metrics = dict(self.counters)
+        uptime = time.time() - self.started
+        metrics.update(
+            workers=self.workers,
+            capacity=self.capacity,
+            uptime=round(uptime, 3),
+            jobs_per_sec=round(metrics["completed"] / uptime, 3) if uptime else 0.0,
+            mb_per_sec=round(metrics["bytes_in"] / 1e6 / uptime, 3) if uptime else 0.0,
+            mean_latency=round(metrics["seconds"] / metrics["completed"], 4) if metrics["completed"] else None,
+            seconds=round(metrics["seconds"], 3),
+        )
+        return metrics
+    
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """ConversionService의 HTTP 인터페이스 (serve 참고)"""
+    
+    max_upload = 512 * 1024 * 1024
+    
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+    
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        service = self.server.service
+        path = urlsplit(self.path).path
+        if path == "/health":
+            metrics = service.metrics()
+            self._send(200, {"status": "busy" if metrics["in_flight"] >= service.capacity else "ok",
+                             "workers": metrics["workers"], "in_flight": metrics["in_flight"],
+                             "capacity": metrics["capacity"]})
+        elif path == "/metrics":
+            self._send(200, service.metrics())
+        else:
+            self._send(404, {"error": "Not found"})
+    
+    def do_POST(self):
+        service = self.server.service
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self._send(404, {"error": "Not found"})
+            return
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            if "path" in query:
+                self._send(200, {"path": query["path"], "stats": service.convert_path(query["path"])})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0:
+                self._send(400, {"error": "Empty request body"})
+                return
+            if length > self.max_upload:
+                self._send(413, {"error": f"Upload exceeds {self.max_upload} bytes"})
+                return
+            data = self.rfile.read(length)
+            body, content_type, stats = service.convert_bytes(data, query.get("format", "zip"))
+            self._send(200, body, content_type, {"X-Conversion-Stats": json.dumps(stats["timings"])})
+        except ServiceBusy as e:
+            self._send(503, {"error": str(e)}, headers={"Retry-After": "1"})
+        except TimeoutError as e:
+            self._send(504, {"error": str(e) or "Conversion timed out"})
+        except (ValueError, FileNotFoundError, PermissionError) as e:
+            self._send(400, {"error": f"{type(e).__name__}: {e}"})
         except Exception as e:
-            print(f"Error processing {mhtml_file}: {str(e)}")
+            logger.error("Conversion failed: %s", e)
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+def make_service_server(service, host="127.0.0.1", port=8080, max_upload=None):
+    """service를 감싼 HTTP 서버를 만듦 (serve_forever는 호출자가 실행, port=0이면 임의 포트)"""
+    handler = type("ServiceHandler", (_ServiceHandler,), {"max_upload": max_upload or _ServiceHandler.max_upload})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+def serve(host="127.0.0.1", port=8080, max_upload=None, **service_options):
+    """로컬 HTTP 변환 서버를 실행 (Ctrl+C로 종료)
+    
+    POST /convert?format=zip|tar|tar.gz|html  요청 본문의 MHTML을 변환하여 결과를 응답 본문으로 반환
+                                              (html은 모든 리소스를 임베드할 수 있을 때만, 아니면 400)
+    POST /convert?path=<root 기준 경로>         서버 쪽 파일을 제자리 변환하고 통계를 JSON으로 반환
+    GET /health, GET /metrics                  상태와 처리량 지표 (JSON)
+    대기열이 가득 차면 503 (Retry-After), 제한 시간을 넘으면 504로 응답한다.
+    service_options는 ConversionService에 전달된다.
+    """
+    service = ConversionService(**service_options)
+    server = make_service_server(service, host, port, max_upload)
+    logger.info("Serving on http://%s:%d (workers: %d, capacity: %d)",
+                *server.server_address[:2], service.workers, service.capacity)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="MHTML 파일을 HTML + 리소스 디렉토리로 변환")
+    arg_parser.add_argument("base_dir", nargs="?", default="./data/survey/raw-survey-data",
+                            help="MHTML 파일을 재귀적으로 찾을 디렉토리")
+    arg_parser.add_argument("--pattern", default="original.mhtml", help="찾을 파일 이름 패턴 (rglob)")
+    arg_parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                            help="변환에 사용할 프로세스 수 (1이면 순차 처리)")
+    arg_parser.add_argument("--max-in-flight", type=int, default=None,
+                            help="동시에 대기열에 올릴 최대 작업 수 (기본값: workers * 2)")
+    arg_parser.add_argument("--download-fonts", action="store_true", help="CSS의 웹 폰트 다운로드 활성화")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="매니페스트 기준으로 이미 최신인 변환 결과는 건너뜀 (중단된 배치 재개)")
+    arg_parser.add_argument("--font-cache-dir", default=None,
+                            help="내려받은 웹 폰트의 디스크 캐시 디렉토리 (실행 간 공유)")
+    arg_parser.add_argument("--store-dir", default=None,
+                            help="배치 전체가 공유하는 내용 주소(해시) 리소스 저장소 디렉토리")
+    arg_parser.add_argument("--store-link", choices=["hardlink", "relative"], default="hardlink",
+                            help="저장소 파일을 페이지에 연결하는 방식")
+    arg_parser.add_argument("--rewrite-engine", choices=sorted(REWRITE_ENGINES), default="stream",
+                            help="HTML 리소스 경로 재작성 엔진")
+    arg_parser.add_argument("--frame-workers", type=int, default=1,
+                            help="아카이브 하나의 추가 HTML 파트(프레임)를 병렬로 재작성할 작업자 수")
+    arg_parser.add_argument("--frame-executor", choices=FRAME_EXECUTORS, default="thread",
+                            help="프레임 병렬 재작성에 사용할 풀 종류")
+    arg_parser.add_argument("--html-only", action="store_true",
+                            help="HTML 파트만 추출 (이미지/CSS/스크립트/폰트 파트는 디코딩하지 않음)")
+    arg_parser.add_argument("--include-types", nargs="+", default=None, metavar="TYPE",
+                            help="추출할 Content-Type 패턴 (예: 'text/*' 'image/png')")
+    arg_parser.add_argument("--exclude-types", nargs="+", default=None, metavar="TYPE",
+                            help="추출하지 않을 Content-Type 패턴 (예: 'font/*' 'video/*')")
+    arg_parser.add_argument("--max-part-size", type=int, default=None,
+                            help="이보다 큰 파트(인코딩된 크기, 바이트)는 추출하지 않음")
+    arg_parser.add_argument("--drop-scripts", action="store_true", help="스크립트 파트를 추출하지 않음")
+    arg_parser.add_argument("--skipped-refs", choices=SKIPPED_REFERENCE_MODES, default="original",
+                            help="추출하지 않은 파트를 가리키는 참조 처리 (원래 URL 유지 또는 자리표시자)")
+    arg_parser.add_argument("--readable-names", action="store_true",
+                            help="리소스 파일명에 원래 파일명을 남김 (기본값: 위치 해시만 사용)")
+    arg_parser.add_argument("--precompress", action="store_true",
+                            help="HTML/CSS/JS 등의 출력 옆에 정적 서버용 .gz (brotli가 있으면 .br) 사본을 만듦")
+    arg_parser.add_argument("--precompress-min-size", type=int, default=PRECOMPRESS_MIN_SIZE,
+                            help="--precompress로 압축할 최소 파일 크기 (바이트)")
+    arg_parser.add_argument("--archive-format", choices=sorted(ARCHIVE_FORMATS), default=None,
+                            help="입력마다 디렉토리 트리 대신 <stem>.<형식> 아카이브 하나로 출력")
+    arg_parser.add_argument("--single-file", action="store_true",
+                            help="CSS를 임베드하고 --inline-limit 이하의 이미지/폰트/스크립트와 @import 스타일시트를 "
+                                 "data: URI로 넣은 단일 파일 출력 (파일로 남은 리소스를 참조하는 스타일시트는 "
+                                 "파일로 기록)")
+    arg_parser.add_argument("--inline-limit", type=int, default=256 * 1024,
+                            help="--single-file에서 data: URI로 넣을 리소스의 최대 크기 (바이트)")
+    arg_parser.add_argument("--archive", default=None,
+                            help="배치 전체를 하나의 아카이브(.zip, .tar, .tar.gz 등)로 출력할 경로")
+    arg_parser.add_argument("--serve", action="store_true",
+                            help="배치 대신 HTTP 변환 서버로 실행 (경로 작업은 base_dir 아래만 허용)")
+    arg_parser.add_argument("--host", default="127.0.0.1", help="--serve에서 바인딩할 주소")
+    arg_parser.add_argument("--port", type=int, default=8080, help="--serve에서 바인딩할 포트")
+    arg_parser.add_argument("--queue-size", type=int, default=None,
+                            help="--serve에서 실행 중인 작업 외에 받아 둘 최대 작업 수 (기본값: workers * 2)")
+    arg_parser.add_argument("--job-timeout", type=float, default=300,
+                            help="--serve에서 작업 하나의 제한 시간 (초, 0이면 제한 없음)")
+    arg_parser.add_argument("--max-upload", type=int, default=512 * 1024 * 1024,
+                            help="--serve에서 받을 업로드의 최대 크기 (바이트)")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="리소스별 디버그 로그 출력")
+    arg_parser.add_argument("-q", "--quiet", action="store_true", help="경고와 오류만 출력")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="단계별 / 콘텐츠 타입별 시간과 메모리를 계측하여 배치 전체 합계를 출력")
+    arg_parser.add_argument("--summary-log", default=None,
+                            help="파일별 변환 요약 이벤트를 JSON Lines로 추가 기록할 파일")
+    args = arg_parser.parse_args(argv)
+    if args.archive and (args.archive_format or args.store_dir or args.incremental or args.precompress):
+        arg_parser.error("--archive cannot be combined with --archive-format, --store-dir, --incremental or --precompress")
+    if args.archive_format and (args.store_dir or args.precompress):
+        arg_parser.error("--archive-format cannot be combined with --store-dir or --precompress")
+    
+    log_level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    configure_logging(log_level, args.summary_log)
+    
+    base_dir = Path(args.base_dir)
+    
+    # 추출 정책 (옵션을 하나도 주지 않으면 모든 파트 추출)
+    policy = None
+    if args.html_only or args.include_types or args.exclude_types or args.max_part_size or args.drop_scripts:
+        policy = ExtractionPolicy(include=["text/html"] if args.html_only else args.include_types,
+                                  exclude=args.exclude_types, max_part_size=args.max_part_size,
+                                  drop_scripts=args.drop_scripts, skipped_references=args.skipped_refs)
+    
+    if args.serve:
+        serve(args.host, args.port, max_upload=args.max_upload, workers=args.workers,
+              queue_size=args.queue_size, job_timeout=args.job_timeout, root=base_dir,
+              log_config=(log_level, args.summary_log), download_fonts=args.download_fonts,
+              font_cache_dir=args.font_cache_dir, rewrite_engine=args.rewrite_engine,
+              frame_workers=args.frame_workers, frame_executor=args.frame_executor, policy=policy,
+              readable_names=args.readable_names)
+        return 0
+    
+    # 모든 original.mhtml 파일 찾기
+    mhtml_files = list(base_dir.rglob(args.pattern))
+    
+    logger.info("Found %d %s files", len(mhtml_files), args.pattern)
+    
+    # 출력 방식별 옵션 (공유 아카이브는 워커가 파일마다 쓴 tar 스풀을 이 프로세스가 순차로 옮김)
+    spool_dir = None
+    if args.archive:
+        archive_sink = open_archive_sink(args.archive, archive_format_for(args.archive))
+        # 스풀은 출력 아카이브와 같은 파일 시스템에 둠 (변환 결과 크기만큼 디스크를 잠시 사용)
+        spool_dir = tempfile.TemporaryDirectory(prefix=".mhtml-spool-", dir=Path(args.archive).resolve().parent)
+        options = {"spool_dir": spool_dir.name}
+    else:
+        archive_sink = None
+        options = {
+            "store_dir": args.store_dir,
+            "store_link": args.store_link,
+            "incremental": args.incremental,
+            "archive_format": args.archive_format,
+            "precompress": args.precompress,
+            "precompress_min_size": args.precompress_min_size,
+        }
+    
+    # 각 파일 처리
+    failed = []
+    skipped = 0
+    profile_totals = aggregate_profiles([])
+    start = time.perf_counter()
+    with contextlib.closing(archive_sink) if archive_sink else contextlib.nullcontext(), \
+            spool_dir or contextlib.nullcontext():
+        for i, record in enumerate(convert_many(mhtml_files, workers=args.workers,
+                                                max_in_flight=args.max_in_flight,
+                                                download_fonts=args.download_fonts,
+                                                font_cache_dir=args.font_cache_dir,
+                                                rewrite_engine=args.rewrite_engine,
+                                                inline_limit=args.inline_limit if args.single_file else None,
+                                                frame_workers=args.frame_workers,
+                                                frame_executor=args.frame_executor,
+                                                policy=policy,
+                                                readable_names=args.readable_names,
+                                                profile=args.profile,
+                                                log_config=(log_level, args.summary_log),
+                                                **options), 1):
+            if archive_sink and record["ok"]:
+                # 입력 파일의 상대 디렉토리를 아카이브 안의 경로 접두어로 사용
+                prefix = Path(record["path"]).parent.relative_to(base_dir).as_posix()
+                prefix = "" if prefix == "." else f"{prefix}/"
+                append_spool(archive_sink, record.pop("spool"), prefix)
+            aggregate_profiles([record], profile_totals)
+            if record["ok"] and record["stats"].get("skipped"):
+                skipped += 1
+                logger.info("[%d/%d] Up to date, skipped: %s", i, len(mhtml_files), record['path'])
+            elif record["ok"]:
+                logger.info("[%d/%d] Successfully processed: %s (%.2fs)", i, len(mhtml_files), record['path'], record['elapsed'])
+            else:
+                failed.append(record)
+                logger.error("[%d/%d] Error processing %s: %s", i, len(mhtml_files), record['path'], record['error'])
+    
+    logger.info("Processing completed. Total: %d Skipped: %d Failed: %d Elapsed: %.2fs",
+                len(mhtml_files), skipped, len(failed), time.perf_counter() - start)
+    for record in failed:
+        logger.error("  - %s: %s", record['path'], record['error'])
+    if args.profile:
+        logger.info("%s", format_profile_report(profile_totals))
+    return 1 if failed else 0
 
-    print("[*] processeing completed. Total:", len(mhtml_files))
-    for i, mhtml_file in enumerate(mhtml_files):
-        print(mhtml_file)
+# 사용 예시
+if __name__ == "__main__":
+    raise SystemExit(main())
     # parse_mhtml_file(r"C:\Users\byunggill\llm_web_translation_data_collector\data_back\43\original.mhtml", download_fonts=False)
\ No newline at end of file
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# read_mhtml.py와 benchmarks 패키지를 저장소 루트에서 import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
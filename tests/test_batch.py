@@ -0,0 +1,70 @@
+"""convert_many의 파일별 실패 격리"""
+import os
+import zipfile
+
+import pytest
+
+import read_mhtml
+from benchmarks.generate import BASE_URL, generate_mhtml
+
+class _CrashingPolicy(read_mhtml.ExtractionPolicy):
+    """세 번째 이미지 파트를 만나면 워커 프로세스를 강제 종료 (메모리 부족으로 죽은 워커 흉내)"""
+    
+    def allows(self, part):
+        if part.get("Content-Location") == f"{BASE_URL}img/2.png":
+            os._exit(1)
+        return super().allows(part)
+
+def test_broken_worker_fails_only_in_flight_files(tmp_path):
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"{i:05d}" / "original.mhtml"
+        # 두 번째 파일만 img/2.png 파트를 가짐
+        generate_mhtml(path, parts=3 if i == 1 else 2, payload_size=64, seed=i)
+        paths.append(path)
+    records = list(read_mhtml.convert_many(paths, workers=2, max_in_flight=2, policy=_CrashingPolicy()))
+    
+    assert sorted(record["path"] for record in records) == sorted(map(str, paths))
+    failed = {record["path"]: record["error"] for record in records if not record["ok"]}
+    assert "BrokenProcessPool" in failed[str(paths[1])]
+    # 풀이 깨졌을 때 진행 중이던 작업만 실패하고 나머지는 새 풀에서 변환됨
+    assert len(failed) <= 2
+
+def test_keyboard_interrupt_is_not_recorded_as_failure(monkeypatch, tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=1, payload_size=64)
+    
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(read_mhtml, "parse_mhtml_file", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        list(read_mhtml.convert_many([path], workers=1))
+
+def test_shared_archive_streams_worker_spools(tmp_path):
+    base_dir = tmp_path / "in"
+    for name in ("a", "b"):
+        generate_mhtml(base_dir / name / "original.mhtml", parts=2, payload_size=256 * 1024)
+    archive = tmp_path / "out.zip"
+    assert read_mhtml.main([str(base_dir), "--archive", str(archive), "-j", "2", "-q"]) == 0
+    
+    expected = read_mhtml.convert_mhtml_to_memory(base_dir / "a" / "original.mhtml", output_name="original.html")
+    with zipfile.ZipFile(archive) as zf:
+        names = set(zf.namelist())
+        for name in ("a", "b"):
+            assert f"{name}/original.html" in names
+            for path, data in expected["resources"].items():
+                assert zf.read(f"{name}/{path}") == data
+    # 워커 스풀은 옮긴 뒤 모두 지워짐
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["in", "out.zip"]
+
+def test_spool_records_do_not_carry_output(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=64)
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    record, = read_mhtml.convert_many([path], workers=2, spool_dir=spool_dir)
+    assert record["ok"] and "files" not in record
+    sink = read_mhtml.MemorySink()
+    read_mhtml.append_spool(sink, record["spool"], "x/")
+    assert "x/original.html" in sink.files and len(sink.files) == 4
+    assert not list(spool_dir.iterdir())
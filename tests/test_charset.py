@@ -0,0 +1,78 @@
+"""CharsetDetector의 인코딩 결정 순서"""
+import codecs
+
+import pytest
+
+import read_mhtml
+
+KOREAN = "한글 문서입니다. 똠방각하"  # '똠'은 EUC-KR에 없고 CP949 확장 영역에만 있음
+
+class _RecordingDetector:
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.samples = []
+    
+    def detect(self, data):
+        self.samples.append(len(data))
+        return {"encoding": self.encoding}
+
+@pytest.fixture
+def detector(monkeypatch):
+    recording = _RecordingDetector("EUC-KR")
+    monkeypatch.setattr(read_mhtml, "fast_chardet", recording)
+    return recording
+
+def test_bom_wins_over_declared_and_meta():
+    payload = codecs.BOM_UTF8 + f'<meta charset="euc-kr"><p>{KOREAN}</p>'.encode("utf-8")
+    text, encoding = read_mhtml.CharsetDetector().decode(payload, "euc-kr")
+    assert encoding == "utf-8-sig" and text.startswith("<meta") and KOREAN in text
+    payload = f"<p>{KOREAN}</p>".encode("utf-16")
+    assert read_mhtml.CharsetDetector().decode(payload, "utf-8") == (f"<p>{KOREAN}</p>", "utf-16")
+
+def test_mime_charset_wins_over_meta():
+    payload = f'<meta charset="utf-8"><p>{KOREAN}</p>'.encode("cp949")
+    assert read_mhtml.CharsetDetector().decode(payload, "euc-kr")[1] == "cp949"
+    # 선언된 charset으로 디코딩되지 않으면 meta로 넘어감
+    payload = f'<meta charset="euc-kr"><p>{KOREAN}</p>'.encode("cp949")
+    text, encoding = read_mhtml.CharsetDetector().decode(payload, "utf-8")
+    assert encoding == "cp949" and KOREAN in text
+
+@pytest.mark.parametrize("label, codec", [
+    ("EUC-KR", "cp949"), ("ks_c_5601-1987", "cp949"), ("Shift_JIS", "cp932"), ("gb2312", "gbk"),
+    ("ISO-8859-1", "cp1252"), (b"utf8", "utf-8"), ('"utf-8"', "utf-8"), ("x-unknown", None), (None, None),
+])
+def test_alias_map(label, codec):
+    assert read_mhtml._normalize_charset(label) == codec
+
+def test_euc_kr_label_decodes_cp949_extensions():
+    payload = f"<p>{KOREAN}</p>".encode("cp949")
+    with pytest.raises(UnicodeDecodeError):
+        payload.decode("euc-kr")
+    assert read_mhtml.CharsetDetector().decode(payload, "euc-kr") == (f"<p>{KOREAN}</p>", "cp949")
+
+def test_meta_is_only_sniffed_in_the_prescan_range(detector):
+    late_meta = b"<!--" + b"x" * 2048 + b'--><meta charset="shift_jis">'
+    payload = late_meta + KOREAN.encode("cp949")
+    read_mhtml.CharsetDetector().decode(payload)
+    # meta를 보지 못해 통계적 감지로 넘어감
+    assert detector.samples
+    # UTF-16을 가리키는 meta는 UTF-8로 취급
+    assert read_mhtml.CharsetDetector()._sniff_meta(b'<meta charset="utf-16le">') == "utf-8"
+
+def test_detection_uses_a_bounded_sample_and_is_reused_for_frames(detector):
+    charset_detector = read_mhtml.CharsetDetector(sample_size=1000)
+    page = (f"<p>{KOREAN}</p>" * 2000).encode("cp949")
+    assert charset_detector.decode(page)[1] == "cp949"
+    assert detector.samples == [1000]
+    assert charset_detector.archive_encoding == "cp949"
+    # 같은 아카이브의 프레임은 다시 감지하지 않고 아카이브 인코딩을 사용
+    frame = f"<div>{KOREAN}</div>".encode("cp949")
+    assert charset_detector.decode(frame) == (f"<div>{KOREAN}</div>", "cp949")
+    assert detector.samples == [1000]
+
+def test_real_detector_on_korean_page(monkeypatch):
+    monkeypatch.setattr(read_mhtml, "fast_chardet", None)
+    page = ("<html><body>" + "<p>한국어로 작성된 웹 페이지의 본문입니다. 인코딩을 감지합니다.</p>" * 50
+            + "</body></html>").encode("euc-kr")
+    text, encoding = read_mhtml.CharsetDetector().decode(page)
+    assert encoding == "cp949" and "인코딩을 감지합니다" in text
@@ -0,0 +1,55 @@
+"""CSS 참조 스캐너 (iter_css_urls / rewrite_css)와 스타일시트 위치 기준 해석"""
+import logging
+
+import read_mhtml
+from benchmarks.generate import BOUNDARY, _part
+
+CSS = """@import url(a.css) screen; @import "b.css"; @import 'c.css' print;
+/* url(x.png) @import "y.css"; */
+div{background:URL( d.png )} p{background:url('e f.png')}"""
+
+def test_iter_css_urls_skips_comments_and_finds_import_forms():
+    assert list(read_mhtml.iter_css_urls(CSS)) == [
+        ("a.css", "url()"), ("b.css", "@import"), ("c.css", "@import"), ("d.png", "url()"), ("e f.png", "url()"),
+    ]
+
+def test_rewrite_css_keeps_unchanged_text_and_comments():
+    rewritten = read_mhtml.rewrite_css(CSS, lambda url, kind: f"new/{url}" if url != "d.png" else None)
+    assert rewritten == CSS.replace("url(a.css)", "url(new/a.css)").replace('"b.css"', '"new/b.css"') \
+        .replace("'c.css'", "'new/c.css'").replace("'e f.png'", "'new/e f.png'")
+    assert "/* url(x.png) @import \"y.css\"; */" in rewritten
+
+def test_rewrite_css_quotes_unsafe_bare_urls():
+    rewritten = read_mhtml.rewrite_css("a{background:url(x.png)} b{background:url(y.png)}",
+                                       lambda url, kind: 'a b".png' if url == "x.png" else "ok(1).png")
+    assert rewritten == 'a{background:url("a b\\".png")} b{background:url("ok(1).png")}'
+
+def test_font_urls_skip_malformed_urls():
+    css = "@font-face{src:url(http://[broken/f.woff2)} @font-face{src:url('g.woff2?v=1') format('woff2')}"
+    assert read_mhtml.css_font_urls(css) == ["g.woff2?v=1"]
+
+def _archive(css, head='<link rel="stylesheet" href="https://cdn.ex.com/css/site.css">'):
+    html = f'<html><head>{head}</head><body>x</body></html>'
+    parts = [
+        _part("text/html", html.encode("utf-8"), "quoted-printable", location="https://www.ex.com/page/index.html"),
+        _part("text/css", css.encode("utf-8"), "quoted-printable", location="https://cdn.ex.com/css/site.css"),
+        _part("image/png", b"\x89PNG" + b"i" * 16, "base64", location="https://cdn.ex.com/img/bg.png"),
+    ]
+    return (f'MIME-Version: 1.0\r\nContent-Type: multipart/related; type="text/html"; '
+            f'boundary="{BOUNDARY}"\r\n\r\n').encode("ascii") + b"".join(parts) + f"--{BOUNDARY}--\r\n".encode("ascii")
+
+def test_stylesheet_urls_resolve_against_its_own_location():
+    result = read_mhtml.convert_mhtml_to_memory(_archive("body{background:url(../img/bg.png)}"))
+    image = next(path for path in result["resources"] if path.startswith("resource/image/"))
+    assert f"url({image})" in result["html"].decode("utf-8")
+
+def test_malformed_css_urls_do_not_fail_the_conversion(caplog):
+    css = "@font-face{src:url(http://[broken/f.woff2)} body{background:url(../img/bg.png)}"
+    with caplog.at_level(logging.DEBUG, logger=read_mhtml.logger.name):
+        result = read_mhtml.convert_mhtml_to_memory(_archive(css), download_fonts=True)
+    html = result["html"].decode("utf-8")
+    assert "url(http://[broken/f.woff2)" in html and "url(resource/image/" in html
+    # 단일 파일 모드의 @import 대상 검사도 잘못된 URL에서 실패하지 않음
+    imported = _archive(css, '<style>@import "https://cdn.ex.com/css/site.css";</style>')
+    result = read_mhtml.convert_mhtml_to_memory(imported, inline_limit=10 ** 6)
+    assert result["html"] is not None
@@ -0,0 +1,49 @@
+"""FilenameAllocator의 결정적 이름과 충돌 처리"""
+import hashlib
+
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+IMAGE_EXTENSIONS = (".png", ".jpg")
+
+def test_names_depend_only_on_the_key():
+    first, second = read_mhtml.FilenameAllocator(), read_mhtml.FilenameAllocator()
+    name = first.allocate("image", "https://ex.com/a/logo.png", "logo.png", IMAGE_EXTENSIONS)
+    assert name == second.allocate("image", "https://ex.com/a/logo.png", "logo.png", IMAGE_EXTENSIONS)
+    assert name == hashlib.sha256(b"https://ex.com/a/logo.png").hexdigest()[:8] + ".png"
+    assert name != second.allocate("image", "https://ex.com/b/logo.png", "logo.png", IMAGE_EXTENSIONS)
+
+def test_collisions_get_suffixes_per_directory_ignoring_case():
+    allocator = read_mhtml.FilenameAllocator(readable=True)
+    key = "https://ex.com/Logo.png"
+    digest = hashlib.sha256(key.encode()).hexdigest()[:8]
+    names = [allocator.allocate("image", key, filename, IMAGE_EXTENSIONS)
+             for filename in ("Logo.png", "logo.PNG", "LOGO.png")]
+    assert names == [f"Logo-{digest}.png", f"logo-{digest}-2.png", f"LOGO-{digest}-3.png"]
+    # 다른 디렉토리는 따로 셈
+    assert allocator.allocate("css", key, "Logo.png", IMAGE_EXTENSIONS) == f"Logo-{digest}.png"
+
+def test_extensions_and_default():
+    allocator = read_mhtml.FilenameAllocator()
+    assert allocator.allocate("image", "k1", "photo.JPG", IMAGE_EXTENSIONS).endswith(".jpg")
+    assert allocator.allocate("image", "k2", "photo.php", IMAGE_EXTENSIONS, ".gif").endswith(".gif")
+    assert "." not in allocator.allocate("image", "k3", "noext")
+
+def test_readable_stems_are_sanitized():
+    allocator = read_mhtml.FilenameAllocator(readable=True)
+    name = allocator.allocate("image", "k", "%ED%95%9C%EA%B8%80 photo (1).png", IMAGE_EXTENSIONS)
+    assert name.startswith("photo-1-") and name.endswith(".png")
+    long_name = allocator.allocate("image", "k", "a" * 100 + ".png", IMAGE_EXTENSIONS)
+    assert long_name.startswith("a" * 40 + "-") and not long_name.startswith("a" * 41)
+    # stem이 비면 해시만 사용
+    assert allocator.allocate("image", "k", "...png", IMAGE_EXTENSIONS)[0] != "-"
+
+def test_reruns_produce_identical_outputs(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=4, payload_size=64, references="mixed", frames=2)
+    for readable in (False, True):
+        first = read_mhtml.convert_mhtml_to_memory(path, readable_names=readable)
+        second = read_mhtml.convert_mhtml_to_memory(path, readable_names=readable)
+        assert first["resources"] == second["resources"]
+        assert first["frames"] == second["frames"]
+        assert first["html"] == second["html"]
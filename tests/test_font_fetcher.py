@@ -0,0 +1,111 @@
+"""FontFetcher를 localhost HTTP 서버에 대해 확인"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import read_mhtml
+
+class _FontHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(1)
+            elif self.path.startswith("/missing"):
+                self.send_error(404)
+                return
+            else:
+                # 동시 요청이 겹치도록 잠시 지연
+                time.sleep(0.05)
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = f"font:{self.path}".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "font/woff2")
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+@pytest.fixture
+def font_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FontHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.active = server.peak = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_fetch_all_downloads_concurrently(font_server):
+    urls = [f"{font_server.url}/f{i}.woff2" for i in range(8)]
+    results = read_mhtml.FontFetcher(max_workers=8).fetch_all(urls + urls[:2])
+    assert results == {url: (f"font:{url[len(font_server.url):]}".encode(), "font/woff2") for url in urls}
+    assert len(font_server.requests) == 8
+    assert font_server.peak > 1
+
+def test_disk_cache_hit_makes_no_request(font_server, tmp_path):
+    url = f"{font_server.url}/a.woff2"
+    first = read_mhtml.FontFetcher(cache_dir=tmp_path).fetch(url)
+    # 새 FontFetcher (다른 실행)에서도 디스크 캐시를 사용
+    second = read_mhtml.FontFetcher(cache_dir=tmp_path).fetch(url)
+    assert first == second == (b"font:/a.woff2", "font/woff2")
+    assert len(font_server.requests) == 1
+
+def test_revalidation_uses_etag(font_server, tmp_path):
+    url = f"{font_server.url}/a.woff2"
+    read_mhtml.FontFetcher(cache_dir=tmp_path).fetch(url)
+    result = read_mhtml.FontFetcher(cache_dir=tmp_path, revalidate=True).fetch(url)
+    assert result == (b"font:/a.woff2", "font/woff2")
+    assert font_server.requests == [("/a.woff2", None), ("/a.woff2", '"v1"')]
+
+def test_non_200_returns_none_and_is_not_cached(font_server, tmp_path):
+    url = f"{font_server.url}/missing.woff2"
+    assert read_mhtml.FontFetcher(cache_dir=tmp_path).fetch(url) is None
+    assert not list(tmp_path.iterdir())
+
+def test_timeout_returns_none(font_server):
+    url = f"{font_server.url}/slow.woff2"
+    fetcher = read_mhtml.FontFetcher(timeout=0.2, retries=0)
+    start = time.perf_counter()
+    assert fetcher.fetch(url) is None
+    assert time.perf_counter() - start < 1
+
+def test_failures_are_retried(font_server):
+    url = f"{font_server.url}/missing.woff2"
+    fetcher = read_mhtml.FontFetcher(retries=0)
+    assert fetcher.fetch(url) is None
+    assert fetcher.fetch(url) is None
+    assert len(font_server.requests) == 2
+
+def test_memory_cache_is_bounded_lru(font_server):
+    urls = [f"{font_server.url}/f{i}.woff2" for i in range(3)]
+    # 세 본문의 크기는 모두 같음
+    size = len(b"font:/f0.woff2")
+    fetcher = read_mhtml.FontFetcher(memory_limit=2 * size)
+    fetcher.fetch(urls[0])
+    fetcher.fetch(urls[1])
+    fetcher.fetch(urls[0])  # f0을 최근 사용으로 옮김
+    fetcher.fetch(urls[2])  # f1이 밀려남
+    assert list(fetcher._memory) == [urls[0], urls[2]]
+    assert fetcher._memory_bytes == 2 * size
+    fetcher.fetch(urls[1])
+    assert [path for path, _ in font_server.requests] == ["/f0.woff2", "/f1.woff2", "/f2.woff2", "/f1.woff2"]
@@ -0,0 +1,33 @@
+"""매니페스트 기반 증분 변환"""
+import os
+
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+def _convert(path, **options):
+    return read_mhtml.parse_mhtml_file(path, download_fonts=False, **options)
+
+def test_unchanged_input_is_skipped(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=64)
+    assert not _convert(path, incremental=True).get("skipped")
+    assert _convert(path, incremental=True)["skipped"]
+    # mtime만 바뀌면 내용 해시로 확인하고 건너뜀
+    os.utime(path, ns=(0, 0))
+    assert _convert(path, incremental=True)["skipped"]
+    # 옵션이 바뀌면 다시 변환
+    assert not _convert(path, incremental=True, rewrite_engine="soup").get("skipped")
+
+def test_input_is_hashed_only_for_incremental_runs(tmp_path, monkeypatch):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=64)
+    digests = []
+    original_digest = read_mhtml._file_digest
+    monkeypatch.setattr(read_mhtml, "_file_digest", lambda p: digests.append(p) or original_digest(p))
+    _convert(path)
+    assert digests == []
+    assert read_mhtml.read_manifest(path)["input"]["sha256"] is None
+    # 해시 없이 기록된 매니페스트는 mtime이 바뀌면 최신으로 보지 않음
+    os.utime(path, ns=(0, 0))
+    assert not _convert(path, incremental=True).get("skipped")
+    assert len(digests) == 1
@@ -0,0 +1,35 @@
+"""경로 / bytes / 파일 객체 입력의 메모리 변환"""
+import os
+import threading
+
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+def test_sources_give_identical_results(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=3, payload_size=256)
+    data = path.read_bytes()
+    expected = read_mhtml.convert_mhtml_to_memory(path)
+    with open(path, "rb") as f:
+        from_file = read_mhtml.convert_mhtml_to_memory(f)
+    from_bytes = read_mhtml.convert_mhtml_to_memory(data)
+    for result in (from_file, from_bytes):
+        assert result["html"] == expected["html"]
+        assert result["resources"] == expected["resources"]
+
+def test_pipe_source_is_read_instead_of_mapped(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=3, payload_size=256)
+    data = path.read_bytes()
+    read_fd, write_fd = os.pipe()
+    
+    def feed():
+        with os.fdopen(write_fd, "wb") as w:
+            w.write(data)
+    writer = threading.Thread(target=feed)
+    writer.start()
+    with os.fdopen(read_fd, "rb") as pipe:
+        result = read_mhtml.convert_mhtml_to_memory(pipe)
+    writer.join()
+    assert result["html"] == read_mhtml.convert_mhtml_to_memory(data)["html"]
+    assert len(result["resources"]) == 4
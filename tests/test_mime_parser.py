@@ -0,0 +1,93 @@
+"""스트리밍 MIME 파서 (iter_mhtml_parts / MHTMLPart.iter_payload)"""
+import base64
+import email
+import quopri
+
+import pytest
+
+import read_mhtml
+from benchmarks.generate import BOUNDARY, generate_mhtml
+
+def _parts(data, chunk_size=None):
+    return [(part.get_content_type(), part.get("Content-Location"), part.get("Content-ID"),
+             b"".join(part.iter_payload(chunk_size)))
+            for part in read_mhtml.iter_mhtml_parts(data)]
+
+def _email_parts(data):
+    return [(part.get_content_type(), part.get("Content-Location"), part.get("Content-ID"),
+             part.get_payload(decode=True))
+            for part in email.message_from_bytes(data).walk() if not part.is_multipart()]
+
+@pytest.mark.parametrize("shape", [
+    dict(encoding="base64"),
+    dict(encoding="quoted-printable", references="cid"),
+    dict(encoding="mixed", references="mixed", frames=2, css_urls=5),
+    dict(encoding="mixed", charset="euc-kr"),
+])
+def test_parity_with_email_package(tmp_path, shape):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=4, payload_size=3000, **shape)
+    data = path.read_bytes()
+    expected = _email_parts(data)
+    assert len(expected) >= 7
+    assert _parts(data) == expected
+    # LF 줄바꿈만 쓰는 아카이브
+    lf_data = data.replace(b"\r\n", b"\n")
+    assert _parts(lf_data) == _email_parts(lf_data)
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 76, 77, 4096])
+def test_payload_split_across_chunk_boundaries(tmp_path, chunk_size):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=1000, encoding="mixed")
+    data = path.read_bytes()
+    assert _parts(data, chunk_size) == _email_parts(data)
+
+def _message(*bodies, preamble=b"", closing=True, newline=b"\r\n"):
+    out = [b'MIME-Version: 1.0', f'Content-Type: multipart/related; boundary="{BOUNDARY}"'.encode(), b"", preamble]
+    for headers, body in bodies:
+        out += [f"--{BOUNDARY}".encode(), *headers, b"", body]
+    if closing:
+        out.append(f"--{BOUNDARY}--".encode())
+    return newline.join(out) + newline
+
+def test_preamble_is_skipped():
+    payload = bytes(range(256)) * 4
+    data = _message(([b"Content-Type: image/png", b"Content-Transfer-Encoding: base64"],
+                     base64.encodebytes(payload).replace(b"\n", b"\r\n").rstrip()),
+                    preamble=f"This is a multi-part message in MIME format.\r\nsee --{BOUNDARY} below".encode())
+    assert _parts(data) == _email_parts(data) == [("image/png", None, None, payload)]
+
+def test_truncated_archive_keeps_last_part():
+    text = "끝나지 않은 문서".encode("utf-8") * 50
+    data = _message(([b"Content-Type: text/html", b"Content-Location: https://ex.com/"], b"<p>first</p>"),
+                    ([b"Content-Type: text/plain", b"Content-Transfer-Encoding: quoted-printable"],
+                     quopri.encodestring(text).replace(b"\n", b"\r\n")),
+                    closing=False)
+    truncated = data[:-40]
+    parts = _parts(truncated)
+    assert [part[0] for part in parts] == ["text/html", "text/plain"]
+    assert parts[0][3] == b"<p>first</p>"
+    assert text.startswith(parts[1][3]) and len(parts[1][3]) > len(text) // 2
+
+def test_nested_multipart_is_flattened():
+    inner = (b'Content-Type: multipart/alternative; boundary="inner"\r\n\r\n'
+             b"--inner\r\nContent-Type: text/plain\r\n\r\nplain\r\n"
+             b"--inner\r\nContent-Type: text/html\r\n\r\n<b>html</b>\r\n--inner--")
+    data = _message(([b"Content-Type: text/html", b"Content-Location: https://ex.com/"], b"<p>main</p>"),
+                    ([], inner.split(b"\r\n\r\n", 1)[1]))
+    # 바깥 파트 헤더 자리에 multipart 헤더를 넣음
+    data = data.replace(f"--{BOUNDARY}\r\n\r\n--inner".encode(),
+                        f'--{BOUNDARY}\r\nContent-Type: multipart/alternative; boundary="inner"\r\n\r\n--inner'.encode())
+    parts = _parts(data)
+    assert parts == _email_parts(data)
+    assert [(part[0], part[3]) for part in parts] == [
+        ("text/html", b"<p>main</p>"), ("text/plain", b"plain"), ("text/html", b"<b>html</b>"),
+    ]
+
+def test_base64_with_missing_padding_and_stray_whitespace():
+    payload = b"padding test!"
+    encoded = base64.b64encode(payload).rstrip(b"=")
+    body = b" ".join(encoded[i:i + 3] for i in range(0, len(encoded), 3))
+    data = _message(([b"Content-Type: application/octet-stream", b"Content-Transfer-Encoding: base64"], body))
+    for chunk_size in (1, 4, 1024):
+        assert _parts(data, chunk_size)[0][3] == payload
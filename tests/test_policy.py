@@ -0,0 +1,71 @@
+"""ExtractionPolicy: 건너뛴 파트는 디코딩하지 않고 참조는 원래 URL 또는 자리표시자로"""
+import pytest
+
+import read_mhtml
+from benchmarks.generate import BASE_URL, generate_mhtml
+
+@pytest.fixture
+def mhtml(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=3, payload_size=4096, references="mixed", frames=1)
+    return path
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """본문을 디코딩한 파트의 Content-Type 목록"""
+    content_types = []
+    iter_payload = read_mhtml.MHTMLPart.iter_payload
+    
+    def recording(self, chunk_size=None):
+        content_types.append(self.get_content_type())
+        return iter_payload(self, chunk_size)
+    monkeypatch.setattr(read_mhtml.MHTMLPart, "iter_payload", recording)
+    return content_types
+
+def test_allows_type_patterns():
+    policy = read_mhtml.ExtractionPolicy(include=["text/*", "image/png"], exclude=["text/css"], drop_scripts=True)
+    assert policy.allows_type("text/html") and policy.allows_type("IMAGE/PNG")
+    assert not policy.allows_type("text/css")
+    assert not policy.allows_type("image/gif")
+    assert not policy.allows_type("text/javascript")
+    assert read_mhtml.ExtractionPolicy().allows_type("application/javascript")
+    with pytest.raises(ValueError):
+        read_mhtml.ExtractionPolicy(skipped_references="drop")
+
+def test_skipped_parts_are_never_decoded(mhtml, decoded):
+    result = read_mhtml.convert_mhtml_to_memory(mhtml, policy=read_mhtml.ExtractionPolicy.html_only())
+    assert set(decoded) == {"text/html"}
+    assert list(result["resources"]) == []
+    assert len(result["frames"]) == 1
+    assert result["stats"]["skipped_parts"] == 5
+
+def test_max_part_size_uses_the_encoded_size(mhtml, decoded):
+    policy = read_mhtml.ExtractionPolicy(max_part_size=4000)
+    result = read_mhtml.convert_mhtml_to_memory(mhtml, policy=policy)
+    # 4096바이트 이미지는 base64로 4000바이트를 넘으므로 디코딩하지 않음
+    assert "image/png" not in decoded
+    assert not [path for path in result["resources"] if path.startswith("resource/image/")]
+    assert [path for path in result["resources"] if path.startswith("resource/javascript/")]
+
+def test_main_document_is_always_extracted(mhtml):
+    policy = read_mhtml.ExtractionPolicy(exclude=["text/html"])
+    result = read_mhtml.convert_mhtml_to_memory(mhtml, policy=policy)
+    assert result["html"] is not None and result["frames"] == {}
+
+def test_original_references_are_kept(mhtml):
+    result = read_mhtml.convert_mhtml_to_memory(mhtml, policy=read_mhtml.ExtractionPolicy(exclude=["image/*"]))
+    html = result["html"].decode("utf-8")
+    assert f'src="{BASE_URL}img/0.png"' in html and 'src="cid:img1@benchmark"' in html
+    assert read_mhtml.PLACEHOLDER_IMAGE not in html
+
+def test_placeholder_references(mhtml):
+    policy = read_mhtml.ExtractionPolicy(exclude=["image/*", "application/javascript"],
+                                         skipped_references="placeholder")
+    result = read_mhtml.convert_mhtml_to_memory(mhtml, policy=policy)
+    html = result["html"].decode("utf-8")
+    assert f"{BASE_URL}img/" not in html and "cid:img" not in html
+    assert html.count(f'src="{read_mhtml.PLACEHOLDER_IMAGE}"') == 3
+    assert f'src="{read_mhtml.PLACEHOLDER_EMPTY}"' in html
+    # 건너뛴 이미지를 가리키는 프레임과 스타일시트 참조도 자리표시자로 바뀜
+    frame = next(iter(result["frames"].values())).decode("utf-8")
+    assert read_mhtml.PLACEHOLDER_IMAGE in frame and "cid:img" not in frame
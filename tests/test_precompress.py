@@ -0,0 +1,32 @@
+"""미리 압축한 사본(.gz/.br)이 출력과 어긋나지 않는지 확인"""
+import gzip
+
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+def _convert(path, **options):
+    return read_mhtml.parse_mhtml_file(path, download_fonts=False, **options)
+
+def test_gzip_sibling_matches_output(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=64)
+    stats = _convert(path, precompress=True, precompress_min_size=10)
+    html = tmp_path / "original.html"
+    assert stats["precompressed"] >= 1
+    assert gzip.decompress((tmp_path / "original.html.gz").read_bytes()) == html.read_bytes()
+
+def test_stale_siblings_are_removed(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=64)
+    _convert(path, precompress=True, precompress_min_size=10)
+    gz_path = tmp_path / "original.html.gz"
+    assert gz_path.exists()
+    
+    # 압축 없이 다시 변환하면 사본이 남지 않아야 함
+    _convert(path)
+    assert not gz_path.exists()
+    
+    # 크기 기준 아래로 내려간 파일의 사본도 제거
+    _convert(path, precompress=True, precompress_min_size=10)
+    _convert(path, precompress=True, precompress_min_size=10 ** 9)
+    assert not gz_path.exists()
@@ -0,0 +1,26 @@
+"""--profile 계측: 단계별 / 콘텐츠 타입별 시간과 최대 메모리"""
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+def test_content_types_record_peak_memory(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=2 * 1024 * 1024)
+    stats = read_mhtml.convert_mhtml_to_memory(path, profile=True)["stats"]
+    content_types = stats["profile"]["content_types"]
+    # 이미지 파트 처리 중에는 디코딩된 페이로드만큼 메모리가 늘어남
+    assert content_types["image/png"]["peak_memory"] >= 2 * 1024 * 1024
+    assert all(entry["peak_memory"] > 0 for entry in content_types.values())
+    
+    totals = read_mhtml.aggregate_profiles([{"stats": stats, "elapsed": 1.0, "path": str(path)}] * 2)
+    assert totals["content_types"]["image/png"]["parts"] == 4
+    assert totals["content_types"]["image/png"]["peak_memory"] == content_types["image/png"]["peak_memory"]
+    report = read_mhtml.format_profile_report(totals)
+    image_line = next(line for line in report.splitlines() if line.startswith("image/png"))
+    assert image_line.split()[-1] == f"{content_types['image/png']['peak_memory'] / 1e6:.2f}"
+
+def test_without_profile_no_memory_is_traced(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=1, payload_size=1024)
+    stats = read_mhtml.convert_mhtml_to_memory(path)["stats"]
+    assert "profile" not in stats or all(entry["peak_memory"] == 0
+                                         for entry in stats["profile"]["content_types"].values())
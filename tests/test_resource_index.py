@@ -0,0 +1,46 @@
+"""ResourceIndex / normalize_url URL 해석"""
+import pytest
+
+import read_mhtml
+from benchmarks.generate import BASE_URL, BOUNDARY, _part
+
+def test_non_utf8_escapes_keep_distinct_keys():
+    index = read_mhtml.ResourceIndex({"http://ex.kr/%B0%A1.png": "GA.png", "http://ex.kr/%B0%A2.png": "GAK.png"})
+    assert read_mhtml.normalize_url("http://ex.kr/%B0%A1.png") != read_mhtml.normalize_url("http://ex.kr/%B0%A2.png")
+    assert index.resolve("http://ex.kr/%B0%A1.png") == "GA.png"
+    assert index.resolve("http://ex.kr/%b0%a2.png") == "GAK.png"
+
+def test_escapes_and_raw_characters_share_a_key():
+    index = read_mhtml.ResourceIndex({"https://ex.com/%ED%95%9C%20a.png?q=%EA%B0%80": "han.png"})
+    assert index.resolve("https://ex.com/한 a.png?q=가") == "han.png"
+    assert index.resolve("HTTPS://EX.COM:443/%ed%95%9c%20a.png?q=%ea%b0%80") == "han.png"
+
+def test_protocol_relative_and_fragment():
+    index = read_mhtml.ResourceIndex({"https://cdn.ex.com/a.png": "a.png", "http://ex.com/b.png": "b.png"})
+    assert index.resolve("//cdn.ex.com/a.png", "https://ex.com/index.html") == "a.png"
+    assert index.resolve("//cdn.ex.com/a.png", "http://ex.com/index.html") is None
+    assert index.resolve("b.png#frag", "http://ex.com/dir/../index.html") == "b.png"
+    assert index.resolve("#frag", "http://ex.com/index.html") is None
+
+@pytest.mark.parametrize("url", ["http://[broken/x.png", "http://ex.com]/x.png"])
+def test_malformed_urls_are_unresolvable(url):
+    index = read_mhtml.ResourceIndex({url: "bad.png", "http://ex.com/ok.png": "ok.png"})
+    assert index.resolve(url) is None
+    assert index.resolve("ok.png", "http://ex.com/") == "ok.png"
+    assert index.resolve("ok.png", "http://[broken/") is None
+
+def test_malformed_references_do_not_fail_the_conversion():
+    html = ('<html><body><img src="http://[broken/x.png"><img src="ok.png">'
+            '<div style="background:url(http://[broken/y.png)">x</div></body></html>')
+    parts = [
+        _part("text/html", html.encode("utf-8"), "quoted-printable", location=f"{BASE_URL}index.html"),
+        _part("image/png", b"\x89PNG" + b"o" * 16, "base64", location=f"{BASE_URL}ok.png"),
+        _part("image/png", b"\x89PNG" + b"b" * 16, "base64", location="http://[broken/x.png"),
+    ]
+    data = (f'MIME-Version: 1.0\r\nContent-Type: multipart/related; type="text/html"; '
+            f'boundary="{BOUNDARY}"\r\n\r\n').encode("ascii") + b"".join(parts) + f"--{BOUNDARY}--\r\n".encode("ascii")
+    for engine in ("stream", "soup"):
+        result = read_mhtml.convert_mhtml_to_memory(data, rewrite_engine=engine)
+        html_out = result["html"].decode("utf-8")
+        assert 'src="http://[broken/x.png"' in html_out
+        assert "ok.png" not in html_out
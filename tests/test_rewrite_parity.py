@@ -0,0 +1,79 @@
+"""stream / soup 재작성 엔진이 같은 링크 해석 결과를 내는지 확인"""
+import pytest
+from bs4 import BeautifulSoup
+
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+MAPPING = {
+    "https://ex.com/a.css": "resource/css/a.css",
+    "https://ex.com/app.js": "resource/javascript/app.js",
+    "https://ex.com/logo.png": "resource/image/logo.png",
+    "https://ex.com/bg.png": "resource/image/bg.png",
+    "https://ex.com/2x.png": "resource/image/2x.png",
+    "https://ex.com/v.mp4": "resource/image/v.mp4",
+    "https://ex.com/o.swf": "resource/image/o.swf",
+    "cid:img2@mhtml": "resource/image/c.png",
+    "img2@mhtml": "resource/image/c.png",
+    "https://ex.com/a.png?x=1&y=2": "resource/image/q.png",
+}
+CIDS = {"img2@mhtml": "resource/image/c.png", "frame1@mhtml": "resource/html/f.html"}
+
+DOCUMENT = """<!DOCTYPE html><HTML><head><meta charset="euc-kr">
+<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">
+<LINK REL="Stylesheet" href="https://ex.com/a.css"><link rel=icon href=https://ex.com/logo.png />
+<script src='https://ex.com/app.js'></script><script>var s="<img src=https://ex.com/logo.png>";</script>
+<style>div{background:url(https://ex.com/bg.png)} @import "https://ex.com/missing.css";</style></head>
+<body style="background:url('https://ex.com/bg.png')"><img src="cid:img2@mhtml" alt="a&amp;b">
+<img src="a.png?x=1&amp;y=2" srcset="https://ex.com/logo.png 1x, https://ex.com/2x.png 2x, nope.png 3x">
+<picture><source srcset="https://ex.com/2x.png 2x, data:image/png;base64,AA,BB 1x"></picture>
+<video poster="https://ex.com/logo.png"><source src="https://ex.com/v.mp4"></video>
+<object data="https://ex.com/o.swf"></object><embed src="https://ex.com/o.swf"><input type=image src="missing.png">
+<iframe src="cid:frame1@mhtml"></iframe><p>한글 &amp; <b>x</b></p><img src="cid:nope">
+<div style="background:url(&quot;cid:img2@mhtml&quot;)">x</div><!-- <img src="https://ex.com/logo.png"> -->
+</body></HTML>"""
+
+URL_ATTRS = ("src", "href", "srcset", "style", "poster", "data")
+
+def _run(engine, document=DOCUMENT):
+    rewriter = read_mhtml.ResourceRewriter(read_mhtml.ResourceIndex(MAPPING, CIDS), "https://ex.com/index.html")
+    output = read_mhtml.rewrite_html(document, rewriter, engine=engine)
+    soup = BeautifulSoup(output, "html.parser")
+    links = [(tag.name, attr, tag[attr]) for tag in soup.find_all(True) for attr in URL_ATTRS if tag.has_attr(attr)]
+    styles = [tag.string for tag in soup.find_all("style")]
+    metas = [dict(tag.attrs) for tag in soup.find_all("meta")]
+    return links, styles, metas, rewriter.replacement_count, rewriter.unmapped
+
+def test_engines_resolve_links_identically():
+    stream, soup = _run("stream"), _run("soup")
+    assert stream[0] == soup[0]
+    assert stream[1] == soup[1]
+    assert stream[3] == soup[3]
+    assert stream[4] == soup[4]
+
+def test_rewritten_references():
+    links, styles, _, _, unmapped = _run("stream")
+    assert ("img", "src", "resource/image/c.png") in links
+    assert ("img", "src", "resource/image/q.png") in links
+    assert ("img", "srcset", "resource/image/logo.png 1x, resource/image/2x.png 2x, nope.png 3x") in links
+    assert ("source", "srcset", "resource/image/2x.png 2x, data:image/png;base64,AA,BB 1x") in links
+    assert ("video", "poster", "resource/image/logo.png") in links
+    assert ("object", "data", "resource/image/o.swf") in links
+    assert "url(resource/image/bg.png)" in styles[0]
+    assert unmapped == {"img[srcset]: nope.png", "input[src]: missing.png", "img[src]: cid:nope"}
+
+@pytest.mark.parametrize("engine", sorted(read_mhtml.REWRITE_ENGINES))
+def test_meta_charset_is_rewritten_to_utf8(engine):
+    _, _, metas, _, _ = _run(engine)
+    assert metas[0]["charset"] == "utf-8"
+    assert metas[1]["content"] == "text/html; charset=utf-8"
+
+@pytest.mark.parametrize("engine", sorted(read_mhtml.REWRITE_ENGINES))
+def test_non_utf8_document_is_written_as_utf8(tmp_path, engine):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=2, payload_size=64, charset="euc-kr")
+    result = read_mhtml.convert_mhtml_to_memory(path, rewrite_engine=engine)
+    html = result["html"].decode("utf-8")
+    assert "벤치마크 문서입니다" in html
+    soup = BeautifulSoup(html, "html.parser")
+    assert soup.find("meta")["charset"] == "utf-8"
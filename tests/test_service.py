@@ -0,0 +1,142 @@
+"""HTTP 변환 서비스를 localhost에서 확인"""
+import io
+import json
+import os
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
+import zipfile
+
+import pytest
+
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+def _block(seconds, options, timeout):
+    """제한 시간 신호를 무시하고 seconds초 동안 워커를 붙잡는 작업 (멈춘 워커 흉내)"""
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+    return seconds
+
+def _pid(options, timeout):
+    return os.getpid()
+
+def _wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+@pytest.fixture
+def service():
+    service = read_mhtml.ConversionService(workers=1, queue_size=0, job_timeout=30)
+    server = read_mhtml.make_service_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield service
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+def _request(url, data=None):
+    request = urllib.request.Request(url, data=data, method="GET" if data is None else "POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+@pytest.fixture
+def mhtml(tmp_path):
+    path = tmp_path / "original.mhtml"
+    generate_mhtml(path, parts=3, payload_size=1024)
+    return path.read_bytes()
+
+def test_upload_returns_zip(service, mhtml):
+    status, headers, body = _request(f"{service.url}/convert", mhtml)
+    assert status == 200 and headers["Content-Type"] == "application/zip"
+    assert "index.html" in zipfile.ZipFile(io.BytesIO(body)).namelist()
+
+def test_upload_without_html_is_rejected(service):
+    for output_format in ("zip", "tar.gz", "html"):
+        status, _, body = _request(f"{service.url}/convert?format={output_format}", b"garbage")
+        assert status == 400, body
+
+def test_health_and_metrics(service, mhtml):
+    _request(f"{service.url}/convert", mhtml)
+    status, _, body = _request(f"{service.url}/health")
+    assert status == 200
+    assert json.loads(body) == {"status": "ok", "workers": 1, "in_flight": 0, "capacity": 1}
+    metrics = json.loads(_request(f"{service.url}/metrics")[2])
+    assert metrics["completed"] == 1 and metrics["bytes_in"] == len(mhtml)
+
+def test_full_queue_returns_503(service, mhtml):
+    blocker = threading.Thread(target=service.run, args=(_block, 1))
+    blocker.start()
+    _wait_until(lambda: service.metrics()["in_flight"] == 1)
+    status, headers, _ = _request(f"{service.url}/convert", mhtml)
+    blocker.join()
+    assert status == 503 and headers["Retry-After"] == "1"
+    assert json.loads(_request(f"{service.url}/health")[2])["in_flight"] == 0
+
+def test_worker_timeout_returns_504(service, tmp_path):
+    path = tmp_path / "large.mhtml"
+    generate_mhtml(path, parts=40, payload_size=512 * 1024)
+    service.job_timeout = 0.01
+    status, _, body = _request(f"{service.url}/convert", path.read_bytes())
+    assert status == 504, body
+    # 워커는 살아 있으므로 다음 작업을 받음
+    service.job_timeout = 30
+    assert service.run(_block, 0) == 0
+
+def test_stuck_worker_is_replaced(service):
+    service.job_timeout = 0.1
+    service.timeout_grace = 0.2
+    worker = service.run(_pid)
+    start = time.time()
+    with pytest.raises(TimeoutError):
+        service.run(_block, 30)
+    # 멈춘 워커를 종료하고 새 풀을 띄우므로 작업 자리와 처리 능력을 되찾음
+    _wait_until(lambda: service.metrics()["in_flight"] == 0)
+    service.job_timeout = 30
+    assert service.run(_block, 0) == 0
+    assert service.run(_pid) != worker
+    assert time.time() - start < 10
+
+def test_html_format_embeds_large_resources(service, tmp_path):
+    path = tmp_path / "large.mhtml"
+    generate_mhtml(path, parts=2, payload_size=400 * 1024)
+    status, headers, body = _request(f"{service.url}/convert?format=html", path.read_bytes())
+    assert status == 200 and headers["Content-Type"].startswith("text/html")
+    assert b"resource/" not in body
+    assert body.count(b"data:image/png;base64,") >= 2
+
+def test_html_format_rejects_frames(service, tmp_path):
+    path = tmp_path / "frames.mhtml"
+    generate_mhtml(path, parts=2, payload_size=1024, frames=1)
+    status, _, body = _request(f"{service.url}/convert?format=html", path.read_bytes())
+    assert status == 400 and b"format=zip" in body
+
+def test_deadline_is_not_swallowed_by_fallbacks(monkeypatch, tmp_path):
+    path = tmp_path / "frames.mhtml"
+    generate_mhtml(path, parts=2, payload_size=1024, frames=2)
+    fallbacks = []
+    stream = read_mhtml.REWRITE_ENGINES["stream"]
+    
+    def slow_frames(content, rewriter, inline_stylesheet=None):
+        if "frame" in (rewriter.base_url or ""):
+            time.sleep(5)
+        return stream(content, rewriter, inline_stylesheet)
+    
+    def soup(*args):
+        fallbacks.append(args)
+        return ""
+    monkeypatch.setitem(read_mhtml.REWRITE_ENGINES, "stream", slow_frames)
+    monkeypatch.setattr(read_mhtml, "rewrite_html_soup", soup)
+    start = time.time()
+    with pytest.raises(TimeoutError):
+        read_mhtml._service_convert_bytes(path.read_bytes(), "zip", {}, 0.2)
+    assert time.time() - start < 2
+    assert not fallbacks
@@ -0,0 +1,58 @@
+"""단일 파일 모드의 @import 스타일시트 임베드"""
+import base64
+import re
+
+import read_mhtml
+from benchmarks.generate import BASE_URL, BOUNDARY, _part
+
+def _archive(theme_css):
+    html = (f'<html><head><link rel="stylesheet" href="{BASE_URL}style.css">'
+            f'<style>@import "{BASE_URL}print.css";</style></head><body>page</body></html>')
+    parts = [
+        _part("text/html", html.encode("utf-8"), "quoted-printable", location=f"{BASE_URL}index.html"),
+        _part("text/css", b'@import url("theme.css");\n.a{color:red}\n', "quoted-printable",
+              location=f"{BASE_URL}style.css"),
+        _part("text/css", theme_css, "quoted-printable", location=f"{BASE_URL}theme.css"),
+        _part("text/css", b'@import "style.css";\n.p{color:black}\n', "quoted-printable",
+              location=f"{BASE_URL}print.css"),
+        _part("image/png", b"\x89PNG" + b"x" * 64, "base64", location=f"{BASE_URL}img/bg.png"),
+    ]
+    header = (f'MIME-Version: 1.0\r\nContent-Type: multipart/related; type="text/html"; '
+              f'boundary="{BOUNDARY}"\r\n\r\n').encode("ascii")
+    return header + b"".join(parts) + f"--{BOUNDARY}--\r\n".encode("ascii")
+
+def _data_uris(html):
+    return [base64.b64decode(encoded).decode("utf-8")
+            for encoded in re.findall(r"data:text/css;base64,([A-Za-z0-9+/=]+)", html)]
+
+def test_imported_stylesheets_become_data_uris():
+    data = _archive(b'.t{background:url("img/bg.png")}\n')
+    result = read_mhtml.convert_mhtml_to_memory(data, inline_limit=10 ** 6)
+    assert not [path for path in result["resources"] if path.endswith(".css")]
+    html = result["html"].decode("utf-8")
+    assert BASE_URL not in html
+    # 중첩 @import (print.css -> style.css -> theme.css)도 임베드된다
+    css = "\n".join(_data_uris(html))
+    assert ".t{background:url(\"data:image/png;base64," in css
+    assert ".p{color:black}" in css
+
+def test_stylesheets_referencing_files_stay_on_disk():
+    data = _archive(b'.t{background:url("img/bg.png")}\n')
+    result = read_mhtml.convert_mhtml_to_memory(data, inline_limit=32)
+    css_paths = [path for path in result["resources"] if path.endswith(".css")]
+    assert css_paths
+    html = result["html"].decode("utf-8")
+    for path in css_paths:
+        assert path in html or any(path.rsplit("/", 1)[1] in result["resources"][other].decode("utf-8")
+                                   for other in css_paths)
+
+def test_directory_mode_keeps_import_files():
+    data = _archive(b".t{color:blue}\n")
+    result = read_mhtml.convert_mhtml_to_memory(data)
+    assert len([path for path in result["resources"] if path.endswith(".css")]) >= 2
+    assert "data:text/css" not in result["html"].decode("utf-8")
+
+def test_import_cycle_falls_back_to_files():
+    data = _archive(b'@import "style.css";\n.t{color:blue}\n')
+    result = read_mhtml.convert_mhtml_to_memory(data, inline_limit=10 ** 6)
+    assert len([path for path in result["resources"] if path.endswith(".css")]) == 3
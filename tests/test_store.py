@@ -0,0 +1,38 @@
+"""내용 주소(해시) 공유 저장소의 중복 제거"""
+import builtins
+
+import read_mhtml
+from benchmarks.generate import generate_mhtml
+
+def test_duplicate_payloads_are_not_rewritten(tmp_path, monkeypatch):
+    store = tmp_path / "store"
+    paths = []
+    for name in ("a", "b"):
+        path = tmp_path / name / "original.mhtml"
+        generate_mhtml(path, parts=3, payload_size=4096, seed=0)
+        paths.append(path)
+    read_mhtml.parse_mhtml_file(paths[0], download_fonts=False, store_dir=store)
+    stored = sorted(p for p in store.rglob("*") if p.is_file())
+    
+    writes = []
+    def tracking_open(file, mode="r", *args, **kwargs):
+        if "w" in mode:
+            writes.append(str(file))
+        return builtins.open(file, mode, *args, **kwargs)
+    monkeypatch.setattr(read_mhtml, "open", tracking_open, raising=False)
+    read_mhtml.parse_mhtml_file(paths[1], download_fonts=False, store_dir=store)
+    
+    # 같은 리소스는 저장소에 이미 있으므로 임시 파일로도 다시 쓰지 않음
+    assert not [path for path in writes if path.startswith(str(store))]
+    assert sorted(p for p in store.rglob("*") if p.is_file()) == stored
+    # 두 페이지의 resource/ 아래에는 저장소 파일의 하드링크가 있음 (저장소 + 페이지 두 개)
+    images = sorted((tmp_path / "b" / "resource" / "image").iterdir())
+    assert len(images) == 3 and all(image.stat().st_nlink == 3 for image in images)
+
+def test_store_payload_writes_new_content_once(tmp_path):
+    data = [b"x" * 10, b"y" * 10]
+    first = read_mhtml.store_payload(iter(data), tmp_path, ".bin", reread=lambda: iter(data))
+    second = read_mhtml.store_payload(iter(data), tmp_path, ".bin", reread=lambda: iter(data))
+    assert first == second
+    assert first.read_bytes() == b"".join(data)
+    assert not list((tmp_path / "tmp").iterdir())